@@ -5,9 +5,57 @@ the .Rmd to output/.
 """
 
 import os
+import re
 import sys
+from itertools import islice
 from pathlib import Path
 
+# Compiled once at import; these run against every line of every script.
+# _LINE_RE splits a line into (leading hashes, gap after them, trimmed text) in one scan.
+_LINE_RE = re.compile(r'^\s*(#*)(\s*)(.*?)\s*$')
+_SEP_RE = re.compile(r'^[=\- ]*[=\-][=\- ]*$')
+_SECTION_RE = re.compile(r'ANALYSIS|SECTION', re.IGNORECASE)
+
+
+def _classify(line):
+    """Classify one line of R source.
+
+    Returns (kind, md_line, text) where kind is 'empty', 'code' or 'comment'. For
+    comments, md_line is the markdown to emit (None for separator lines such as
+    '# =====') and text is the comment with its first '#' removed, used by the
+    name/ID heuristic.
+    """
+    hashes, gap, text = _LINE_RE.match(line).groups()
+    if not hashes:
+        return ('code', None, None) if text else ('empty', None, None)
+
+    hash_count = len(hashes)
+    if hash_count >= 2:
+        # Header: the number of #'s sets the level
+        md_line = f"{'#' * min(hash_count, 6)} {text}\n"
+        return 'comment', md_line, f"{hashes[1:]}{gap}{text}" if text else hashes[1:]
+    if _SEP_RE.match(text):
+        # Separator line (all = or -), skipped
+        return 'comment', None, text
+    if _SECTION_RE.search(text):
+        # Likely a section header
+        return 'comment', f"## {text}\n", text
+    # Regular comment
+    return 'comment', f"{text}\n", text
+
+
+def list_input_files(input_dir, suffix):
+    """Sorted names of the regular files in input_dir ending with suffix.
+
+    One os.scandir pass; DirEntry.is_file() answers from the directory listing
+    instead of stat-ing every match the way Path.glob does.
+    """
+    try:
+        with os.scandir(input_dir) as entries:
+            return sorted(e.name for e in entries if e.is_file() and e.name.endswith(suffix))
+    except FileNotFoundError:
+        return []
+
 
 def convert_r_to_rmd(r_path: str, output_path: str | None = None,
                      input_dir: str | None = None, output_dir: str | None = None) -> bool:
@@ -22,6 +70,18 @@ def convert_r_to_rmd(r_path: str, output_path: str | None = None,
     Returns:
         bool: True if conversion successful, False otherwise
     """
+    return _convert_r_to_rmd(r_path, output_path, input_dir, output_dir,
+                             create_output_dir=True)
+
+
+def _convert_r_to_rmd(r_path, output_path, input_dir, output_dir, create_output_dir):
+    """convert_r_to_rmd, plus a knob for batch callers (kept out of the public
+    signature, which agent.py turns into the tool schema).
+
+    Args:
+        create_output_dir: Create output_dir if missing. Batch callers that already
+            created it pass False to skip the per-file mkdir.
+    """
 
     # Set default directories if not provided. Default relative to this script, not
     # the caller's working directory, so it works no matter where it's invoked from.
@@ -37,7 +97,8 @@ def convert_r_to_rmd(r_path: str, output_path: str | None = None,
     else:
         output_dir = Path(output_dir)
     
-    output_dir.mkdir(exist_ok=True)
+    if create_output_dir:
+        output_dir.mkdir(exist_ok=True)
     
     # Check if already Rmd format
     try:
@@ -63,10 +124,6 @@ def convert_r_to_rmd(r_path: str, output_path: str | None = None,
     full_output_path = output_dir / rmd_name
     
     try:
-        # attempt to read R file
-        with open(full_input_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
         rmd_lines = []
         
         # Add YAML header
@@ -75,169 +132,103 @@ def convert_r_to_rmd(r_path: str, output_path: str | None = None,
         rmd_lines.append("output: pdf_document\n")
         rmd_lines.append("---\n")
         rmd_lines.append("\n")
+
+        def emit(text):
+            """Append to the output, collapsing consecutive empty lines into one"""
+            if text == "\n" and rmd_lines[-1] == "\n":
+                return
+            rmd_lines.append(text)
         
-        # Track state
-        in_code_chunk = False
+        # Track state. Code lines are buffered in current_code and written as one
+        # R chunk when a comment (or the end of the file) closes it.
         current_code = []
         consecutive_empty_lines = 0
-        line_number = 0
         name_lines = []  # For collecting name/ID at the start
         last_added = None  # Track what we last added: 'code', 'comment', 'name', None
         max_empty_lines = 1  # Maximum consecutive empty lines to preserve
         
-        def is_separator_line(text):
-            """Check if line is just a separator (all = or -)"""
-            text = text.strip()
-            if not text:
-                return False
-            # Check if all characters are = or - or spaces
-            return all(c in '=- ' for c in text) and ('=' in text or '-' in text)
-        
-        def flush_code_chunk():
-            """Write accumulated code as an R code chunk"""
-            nonlocal in_code_chunk, current_code
-            if current_code:
-                if not in_code_chunk:
-                    rmd_lines.append("```{r}\n")
-                    in_code_chunk = True
-                for code_line in current_code:
-                    rmd_lines.append(code_line)
-                current_code = []
-        
-        def close_code_chunk():
-            """Close the current R code chunk"""
-            nonlocal in_code_chunk, last_added
-            if in_code_chunk:
-                rmd_lines.append("```\n")
-                # Add one empty line after code chunk
-                rmd_lines.append("\n")
-                in_code_chunk = False
-                last_added = 'code'
-        
-        def process_comment(comment_text, stripped_line):
-            """Process a comment line and return markdown"""
-            # Remove leading # and any extra spaces
-            text = comment_text[1:].strip()
+        # Process each line, streaming the R file rather than reading it all up front
+        with open(full_input_path, 'r', encoding='utf-8', buffering=1 << 20) as f:
+            # The first five lines are the preamble, where short comments are taken as
+            # the author's name/ID; islice peels them off so the main pass has no
+            # line counter to maintain
+            for in_preamble, lines in ((True, islice(f, 5)), (False, f)):
+                for line in lines:
+                    kind, md_line, comment_text = _classify(line)
             
-            # Check if it's a separator line (all = or -)
-            if is_separator_line(text):
-                # Skip separator lines
-                return None
+                    # Empty line
+                    if kind == 'empty':
+                        consecutive_empty_lines += 1
+                        # Limit consecutive empty lines
+                        if consecutive_empty_lines <= max_empty_lines:
+                            emit("\n")
+                        continue
             
-            # Check if it's a header (has multiple #)
-            if stripped_line.startswith('##'):
-                # Count # to determine header level
-                hash_count = len(stripped_line) - len(stripped_line.lstrip('#'))
-                header_text = stripped_line[hash_count:].strip()
-                if header_text.startswith(' '):
-                    header_text = header_text[1:]
-                return f"{'#' * min(hash_count, 6)} {header_text}\n"
-            elif 'ANALYSIS' in text.upper() or 'SECTION' in text.upper():
-                # Likely a section header
-                return f"## {text}\n"
-            else:
-                # Regular comment
-                return f"{text}\n"
-        
-        # Process each line
-        for line in lines:
-            line_number += 1
-            stripped = line.strip()
-            original_line = line
-            
-            # Empty line
-            if not stripped:
-                consecutive_empty_lines += 1
-                # Only add empty line if we're not in a code chunk
-                if not in_code_chunk:
-                    # Limit consecutive empty lines
-                    if consecutive_empty_lines <= max_empty_lines:
-                        rmd_lines.append("\n")
-                elif consecutive_empty_lines >= 2:
-                    # Multiple empty lines - close code chunk
-                    flush_code_chunk()
-                    close_code_chunk()
-                    # Add one empty line after closing code chunk
-                    if consecutive_empty_lines == 2:
-                        rmd_lines.append("\n")
                     consecutive_empty_lines = 0
-                continue
             
-            consecutive_empty_lines = 0
-            
-            # Comment line (starts with #)
-            if stripped.startswith('#'):
-                # Close any open code chunk first
-                flush_code_chunk()
-                close_code_chunk()
-                
-                # Process the comment
-                md_line = process_comment(stripped, stripped)
+                    # Comment line (starts with #)
+                    if kind == 'comment':
+                        # Close any open code chunk first
+                        if current_code:
+                            emit("```{r}\n")
+                            rmd_lines.extend(current_code)
+                            emit("```\n")
+                            # Add one empty line after code chunk
+                            emit("\n")
+                            current_code = []
+                            last_added = 'code'
                 
-                if md_line is not None:
-                    # Handle name/ID at the beginning (first few non-separator comments)
-                    comment_text_after_hash = stripped[1:].strip()
-                    if line_number <= 5 and not is_separator_line(comment_text_after_hash) and len(comment_text_after_hash) < 30:
-                        name_lines.append(md_line.strip())
+                        if md_line is not None:
+                            # Handle name/ID at the beginning (first few non-separator comments)
+                            if in_preamble and len(comment_text) < 30:
+                                name_lines.append(md_line.strip())
+                            else:
+                                # Write name lines if we have them, before this comment
+                                if name_lines:
+                                    for nl in name_lines:
+                                        emit(f"**{nl}**  \n")
+                                    emit("\n")
+                                    name_lines = []
+                                    last_added = 'name'
+                        
+                                # Add comment
+                                emit(md_line)
+                                # Only add empty line if it's a header or if last wasn't a comment
+                                is_header = md_line.startswith('#')
+                                if is_header or last_added != 'comment':
+                                    emit("\n")
+                                last_added = 'comment'
                     else:
-                        # Write name lines if we have them, before this comment
+                        # Code line
+                        # If we have name lines collected, write them now
                         if name_lines:
-                            for nl in name_lines:
-                                rmd_lines.append(f"**{nl}**  \n")
-                            rmd_lines.append("\n")
+                            # Format name/ID section
+                            if len(name_lines) == 1:
+                                emit(f"**{name_lines[0]}**\n\n")
+                            else:
+                                for nl in name_lines:
+                                    emit(f"**{nl}**  \n")
+                                emit("\n")
                             name_lines = []
                             last_added = 'name'
-                        
-                        # Add comment
-                        rmd_lines.append(md_line)
-                        # Only add empty line if it's a header or if last wasn't a comment
-                        is_header = md_line.startswith('#')
-                        if is_header or last_added != 'comment':
-                            rmd_lines.append("\n")
-                        last_added = 'comment'
-            else:
-                # Code line
-                # If we have name lines collected, write them now
-                if name_lines:
-                    # Format name/ID section
-                    if len(name_lines) == 1:
-                        rmd_lines.append(f"**{name_lines[0]}**\n\n")
-                    else:
-                        for nl in name_lines:
-                            rmd_lines.append(f"**{nl}**  \n")
-                        rmd_lines.append("\n")
-                    name_lines = []
-                    last_added = 'name'
                 
-                # Add to code chunk (will be grouped together)
-                current_code.append(original_line)
+                        # Add to code chunk (will be grouped together)
+                        current_code.append(line)
         
         # Handle any remaining name lines
         if name_lines:
             if len(name_lines) == 1:
-                rmd_lines.append(f"**{name_lines[0]}**\n\n")
+                emit(f"**{name_lines[0]}**\n\n")
             else:
                 for nl in name_lines:
-                    rmd_lines.append(f"**{nl}**  \n")
-                rmd_lines.append("\n")
+                    emit(f"**{nl}**  \n")
+                emit("\n")
         
-        # Flush any remaining content
-        flush_code_chunk()
-        close_code_chunk()
-        
-        # Post-process: collapse multiple consecutive empty lines into one
-        cleaned_lines = []
-        prev_was_empty = False
-        for line in rmd_lines:
-            if line == "\n":
-                if not prev_was_empty:
-                    cleaned_lines.append(line)
-                prev_was_empty = True
-            else:
-                cleaned_lines.append(line)
-                prev_was_empty = False
-        
-        rmd_lines = cleaned_lines
+        # Flush any remaining code
+        if current_code:
+            emit("```{r}\n")
+            rmd_lines.extend(current_code)
+            emit("```\n")
         
         # Clean up excessive empty lines at the end
         while rmd_lines and rmd_lines[-1] == "\n":
@@ -249,14 +240,10 @@ def convert_r_to_rmd(r_path: str, output_path: str | None = None,
         # Write Rmd file
         print(f"Converting '{full_input_path}' to '{full_output_path}'...")
         with open(full_output_path, 'w', encoding='utf-8') as f:
-            f.writelines(rmd_lines)
+            f.write(''.join(rmd_lines))
         
-        if full_output_path.exists():
-            print(f"Successfully converted to '{full_output_path}'")
-            return True
-        else:
-            print("Rmd file creation failed")
-            return False
+        print(f"Successfully converted to '{full_output_path}'")
+        return True
     
     except Exception as e:
         print(f"Error converting R to Rmd: {e}")
@@ -288,7 +275,7 @@ def main():
                 sys.exit(1)
         else:
             # Convert all .R files in input/
-            r_files = sorted(p for p in input_dir.glob("*.R"))
+            r_files = list_input_files(input_dir, ".R")
             if not r_files:
                 print(f"No .R files found in {input_dir} folder")
                 print("Usage: python R_Rmd.py <file.R> [output.Rmd] [--input-dir DIR] [--output-dir DIR]")
@@ -297,7 +284,8 @@ def main():
                 return
             any_failed = False
             for r_file in r_files:
-                ok = convert_r_to_rmd(r_file.name, None, input_dir, output_dir)
+                ok = _convert_r_to_rmd(r_file, None, input_dir, output_dir,
+                                       create_output_dir=False)
                 if not ok:
                     any_failed = True
             if any_failed:
@@ -310,7 +298,7 @@ def main():
             input_dir = script_dir / "input"
             output_dir = script_dir / "output"
             output_dir.mkdir(exist_ok=True)
-            r_files = sorted(p for p in input_dir.glob("*.R"))
+            r_files = list_input_files(input_dir, ".R")
             if not r_files:
                 print("No .R files found in input folder")
                 print("Usage: python R_Rmd.py <file.R> [output.Rmd]")
@@ -318,7 +306,8 @@ def main():
                 return
             any_failed = False
             for r_file in r_files:
-                ok = convert_r_to_rmd(r_file.name, None, input_dir, output_dir)
+                ok = _convert_r_to_rmd(r_file, None, input_dir, output_dir,
+                                       create_output_dir=False)
                 if not ok:
                     any_failed = True
             if any_failed:
@@ -8,15 +8,272 @@ with today's date, then renders it to a PDF in output/.
 import os
 import sys
 import subprocess
+import tempfile
+import textwrap
+import time
+import atexit
+import threading
 import argparse
+import io
+import json
+import hashlib
+import shutil
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from shutil import which
 from datetime import date
+from functools import lru_cache
 import re
 
 
+# Escapes for code blocks in the pandoc fallback: backslashes are doubled (so \n
+# becomes \\n), $ would start math mode and # is a macro parameter. A translate table
+# does all three in one pass without re-escaping the backslashes it inserts.
+_LATEX_CODE_ESCAPES = str.maketrans({'\\': '\\\\', '$': '\\$', '#': '\\#'})
+
+
+# Cached so a batch run walks $PATH once per tool instead of once per file; the
+# absolute path is passed to subprocess so the child doesn't search $PATH either.
+@lru_cache(maxsize=8)
+def find_tool(cmd):
+    """Absolute path of cmd on $PATH, or None if it isn't installed."""
+    return which(cmd)
+
+
 def command_exists(cmd):
-    return which(cmd) is not None
+    return find_tool(cmd) is not None
+
+
+# rmarkdown-rendered PDFs keyed by content hash. Kept next to this script rather
+# than in the output folder, so it's shared across runs (and server jobs) and never
+# ends up in the converted results. The key covers only the document itself, not
+# files its R chunks read (data, child documents, images); --no-cache re-renders
+# after those change.
+CACHE_DIR = Path(__file__).resolve().parent / ".cache" / "Rmd_pdf"
+
+# Most PDFs kept in CACHE_DIR; the least recently used are removed past this
+CACHE_MAX_ENTRIES = 200
+
+
+@lru_cache(maxsize=1)
+def tool_versions():
+    """Version banners of Rscript and pandoc, so upgrading either invalidates the cache."""
+    banners = []
+    for tool in ("Rscript", "pandoc"):
+        path = find_tool(tool)
+        if path is None:
+            banners.append(f"{tool}: not installed")
+            continue
+        try:
+            result = subprocess.run([path, "--version"], capture_output=True)
+            banners.append(decode_stderr(result.stdout + result.stderr))
+        except OSError:
+            banners.append(f"{tool}: unavailable")
+    return "\n".join(banners)
+
+
+def fast_mode():
+    """True when FILECONV_FAST is set (or --fast was passed).
+
+    Fast mode trades file size for speed in the pandoc fallback: xelatex's PDF
+    driver skips compressing streams and images (-z0), and LaTeX runs in batch mode.
+    """
+    return bool(os.environ.get('FILECONV_FAST'))
+
+
+def cached_pdf_path(content):
+    """Cache location for a PDF rmarkdown rendered from the prepared Rmd content.
+
+    Only rmarkdown renders are cached: a pandoc fallback PDF never ran the R chunks,
+    so it mustn't be served once R works again.
+    """
+    digest = hashlib.sha256(content.encode('utf-8'))
+    digest.update(tool_versions().encode('utf-8'))
+    digest.update(b'renderer: rmarkdown')
+    return CACHE_DIR / f"{digest.hexdigest()}.pdf"
+
+
+def restore_cached_pdf(cache_pdf, full_output_path):
+    """Copy a cached PDF to full_output_path. Returns False on a cache miss."""
+    try:
+        shutil.copyfile(cache_pdf, full_output_path)
+    except FileNotFoundError:
+        return False
+    # Mark it recently used, so prune_cache() keeps it
+    try:
+        os.utime(cache_pdf)
+    except OSError:
+        pass
+    print(f"Successfully converted to '{full_output_path}' (cached)")
+    return True
+
+
+def store_cached_pdf(pdf_path, cache_pdf):
+    """Save a freshly rendered PDF in the cache. Failures only cost a future re-render."""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Copy then rename, so a concurrent job never restores a half-written PDF
+        with tempfile.NamedTemporaryFile(dir=CACHE_DIR, suffix='.part', delete=False) as tmp:
+            with open(pdf_path, 'rb') as src:
+                shutil.copyfileobj(src, tmp)
+        os.replace(tmp.name, cache_pdf)
+    except OSError as e:
+        print(f"Warning: could not cache '{pdf_path}': {e}")
+        return
+    prune_cache()
+
+
+def prune_cache(max_entries=CACHE_MAX_ENTRIES):
+    """Remove the least recently used PDFs beyond max_entries from the cache."""
+    entries = []
+    try:
+        with os.scandir(CACHE_DIR) as it:
+            for entry in it:
+                if entry.name.endswith('.pdf'):
+                    try:
+                        entries.append((entry.stat().st_mtime, entry.path))
+                    except OSError:
+                        pass
+    except OSError:
+        return
+    if len(entries) <= max_entries:
+        return
+    entries.sort()
+    for _, path in entries[:len(entries) - max_entries]:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+# LaTeX header the pandoc fallback includes for better text wrapping
+PANDOC_HEADER = r"""\usepackage{microtype}
+\usepackage{xurl}
+\usepackage{fvextra}
+\usepackage{seqsplit}
+\usepackage{url}
+\PassOptionsToPackage{hyphens}{url}
+\sloppy
+\emergencystretch=3em
+\setlength{\emergencystretch}{3em}
+\hyphenpenalty=50
+\hbadness=10000
+\tolerance=9999
+\overfullrule=0pt
+\interlinepenalty=10000
+\pretolerance=1000
+"""
+
+_pandoc_header_lock = threading.Lock()
+_pandoc_header_path = None
+
+
+def write_temp_rmd(content, directory):
+    """Write prepared Rmd content to a hidden temp file in directory for rmarkdown.
+
+    rmarkdown resolves relative paths (data files, images, child documents) against
+    the document's own folder, so the patched copy goes next to the original rather
+    than in the system temp folder. Falls back to the temp folder if directory isn't
+    writable.
+
+    Returns:
+        str: Path of the temp file; the caller deletes it
+    """
+    try:
+        tmp = tempfile.NamedTemporaryFile(mode='w', prefix='.', suffix='.Rmd', dir=directory,
+                                          delete=False, encoding='utf-8')
+    except OSError:
+        tmp = tempfile.NamedTemporaryFile(mode='w', suffix='.Rmd', delete=False,
+                                          encoding='utf-8')
+    with tmp:
+        tmp.write(content)
+    return tmp.name
+
+
+def pandoc_header_path():
+    """Path of a temp .tex file holding PANDOC_HEADER.
+
+    Written on first use and shared by every pandoc run in the process (removed at
+    exit), instead of writing and deleting a copy per file. It's rewritten if
+    something has cleaned it out of the temp folder in the meantime.
+    """
+    global _pandoc_header_path
+    with _pandoc_header_lock:
+        if _pandoc_header_path is None or not os.path.exists(_pandoc_header_path):
+            with tempfile.NamedTemporaryFile(mode='w', suffix='.tex', delete=False,
+                                             encoding='utf-8') as tmp:
+                tmp.write(PANDOC_HEADER)
+            _pandoc_header_path = tmp.name
+            atexit.register(remove_file, tmp.name)
+        return _pandoc_header_path
+
+
+def remove_file(path):
+    """Delete path if it still exists."""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _write_stdin(stdin, data):
+    """Write data to a child's stdin and close it, ignoring a child that exited early."""
+    try:
+        stdin.write(data)
+    except BrokenPipeError:
+        pass
+    finally:
+        try:
+            stdin.close()
+        except BrokenPipeError:
+            pass
+
+
+def run_tool(cmd, max_stderr_lines=200, input=None):
+    """Run cmd with stdout discarded, keeping only the tail of its stderr.
+
+    rmarkdown and LaTeX can write very long logs. Reading stderr line by line into a
+    bounded deque keeps memory flat however much they print, and the last lines are
+    where the error is.
+
+    Args:
+        input: bytes to feed to cmd's stdin, written from a separate thread so a
+            child that logs before it has read all of it can't deadlock.
+
+    Returns:
+        subprocess.CompletedProcess: returncode plus the stderr tail as bytes
+    """
+    stdin = subprocess.PIPE if input is not None else None
+    with subprocess.Popen(cmd, stdin=stdin, stdout=subprocess.DEVNULL,
+                          stderr=subprocess.PIPE) as proc:
+        if input is not None:
+            feeder = threading.Thread(target=_write_stdin, args=(proc.stdin, input))
+            feeder.start()
+        tail = deque(proc.stderr, maxlen=max_stderr_lines)
+        if input is not None:
+            feeder.join()
+    return subprocess.CompletedProcess(cmd, proc.returncode, None, b''.join(tail))
+
+
+def decode_stderr(stderr: bytes) -> str:
+    """Decode captured stderr for display.
+
+    Subprocess stdout goes to DEVNULL and stderr is kept as bytes, so the (often
+    long) rmarkdown/LaTeX log is only decoded when a conversion fails and it's
+    actually shown.
+    """
+    return stderr.decode('utf-8', errors='replace').strip()
+
+
+def list_input_files(input_dir, suffix):
+    """Sorted names of the files in input_dir ending with suffix, from one scandir pass."""
+    try:
+        with os.scandir(input_dir) as entries:
+            return sorted(e.name for e in entries if e.is_file() and e.name.endswith(suffix))
+    except FileNotFoundError:
+        return []
+
 
 def replace_sys_date(content):
     """Replace Sys.Date() with the actual current date in YYYY-MM-DD format."""
@@ -31,12 +288,38 @@ def replace_sys_date(content):
     content = re.sub(standalone_pattern, current_date, content)
     return content
 
+
+def prepare_rmd_content(content):
+    """Prepare Rmd source for rmarkdown: substitute Sys.Date() and default to 1in margins."""
+    # Replace Sys.Date() with actual date
+    content = replace_sys_date(content)
+
+    # Check if YAML header exists and add geometry settings for proper margins
+    if content.startswith('---'):
+        # Find the end of YAML header
+        yaml_end = content.find('---', 3)
+        if yaml_end != -1:
+            yaml_header = content[:yaml_end]
+            # Add geometry settings if not already present, just before the closing
+            # '---' (which has to start its own line), building the new text in one join
+            if (yaml_header.endswith('\n') and 'geometry:' not in yaml_header
+                    and 'margin' not in yaml_header.lower()):
+                content = ''.join((yaml_header, 'geometry: margin=1in\n', content[yaml_end:]))
+    else:
+        # No YAML header, prepend one
+        content = '---\ngeometry: margin=1in\n---\n\n' + content
+    return content
+
+
 # convert an R markdown file to a pdf file
 def convert_rmd_to_pdf(rmd_path: str, output_path: str | None = None,
                        input_dir: str | None = None, output_dir: str | None = None) -> bool:
     """Convert an R Markdown file to PDF.
 
     Prefers R's rmarkdown (which executes R code chunks) and falls back to pandoc.
+    A document whose content (and tool versions) match an earlier rmarkdown render
+    is copied from the cache instead of being rendered again. Files the R chunks
+    read aren't part of that match, so run with --no-cache after changing them.
 
     Args:
         rmd_path: Path to the .Rmd file (relative to input folder or absolute)
@@ -47,6 +330,21 @@ def convert_rmd_to_pdf(rmd_path: str, output_path: str | None = None,
     Returns:
         bool: True if conversion successful, False otherwise
     """
+    return _convert_rmd_to_pdf(rmd_path, output_path, input_dir, output_dir,
+                               create_output_dir=True, use_cache=True)
+
+
+def _convert_rmd_to_pdf(rmd_path, output_path, input_dir, output_dir,
+                        create_output_dir, use_cache):
+    """convert_rmd_to_pdf, plus knobs for the command line and batch callers (kept
+    out of the public signature, which agent.py turns into the tool schema).
+
+    Args:
+        create_output_dir: Create output_dir if missing. Batch callers that already
+            created it pass False to skip the per-file mkdir.
+        use_cache: Reuse and save cached renders. False for --no-cache, when R code
+            reads data that may have changed since the last render.
+    """
     # Set default directories if not provided. Default relative to this script, not
     # the caller's working directory, so it works no matter where it's invoked from.
     script_dir = Path(__file__).resolve().parent
@@ -61,21 +359,20 @@ def convert_rmd_to_pdf(rmd_path: str, output_path: str | None = None,
     else:
         output_dir = Path(output_dir)
     
-    output_dir.mkdir(exist_ok=True)
+    if create_output_dir:
+        output_dir.mkdir(exist_ok=True)
 
     # if the provided path already points to a PDF, stop
+    rmd_str = os.fspath(rmd_path)
     try:
-        if Path(rmd_path).suffix.lower() == ".pdf":
+        if rmd_str.lower().endswith(".pdf"):
             print("That file is already in pdf format")
             return False
     except Exception:
         pass
 
     # Build full input path
-    full_input_path = Path(rmd_path) if os.path.isabs(str(rmd_path)) else input_dir / rmd_path
-    if not full_input_path.exists():
-        print(f"Error: Rmd file '{full_input_path}' not found")
-        return False
+    full_input_path = Path(rmd_path) if os.path.isabs(rmd_str) else input_dir / rmd_path
 
     # Compute output name
     if output_path is None:
@@ -83,54 +380,63 @@ def convert_rmd_to_pdf(rmd_path: str, output_path: str | None = None,
     else:
         pdf_name = Path(output_path).name
     full_output_path = output_dir / pdf_name
+    # String forms for the R expression and command lines, converted once
+    output_dir_str = os.fspath(output_dir)
+    output_path_str = os.fspath(full_output_path)
+
+    # Read and prepare the source once; the cache key, the rmarkdown render and the
+    # pandoc fallback all work from this copy. Opening it directly doubles as the
+    # existence check.
+    try:
+        with open(full_input_path, 'r', encoding='utf-8') as f:
+            original = f.read()
+    except FileNotFoundError:
+        print(f"Error: Rmd file '{full_input_path}' not found")
+        return False
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Error reading '{full_input_path}': {e}")
+        return False
+    content = prepare_rmd_content(original)
+
+    # Cached PDFs are rmarkdown renders, so they're only used when R is available to
+    # have produced one now
+    cache_pdf = None
+    if use_cache and command_exists("Rscript"):
+        cache_pdf = cached_pdf_path(content)
+        if restore_cached_pdf(cache_pdf, full_output_path):
+            return True
 
     # Try via R + rmarkdown (best for .Rmd with code chunks)
     if command_exists("Rscript"):
-        import tempfile
         temp_path = None
         try:
-            # Create a modified version with better formatting to prevent text overflow
-            with open(full_input_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Replace Sys.Date() with actual date
-            content = replace_sys_date(content)
-            
-            # Check if YAML header exists and add geometry settings for proper margins
-            if content.startswith('---'):
-                # Find the end of YAML header
-                yaml_end = content.find('---', 3)
-                if yaml_end != -1:
-                    yaml_header = content[:yaml_end + 3]
-                    # Add geometry settings if not already present
-                    if 'geometry:' not in yaml_header and 'margin' not in yaml_header.lower():
-                        yaml_header = yaml_header.replace('\n---', '\ngeometry: margin=1in\n---')
-                        content = yaml_header + content[yaml_end + 3:]
-            else:
-                # No YAML header, prepend one
-                content = '---\ngeometry: margin=1in\n---\n\n' + content
-            
-            # Create temp file
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.Rmd', delete=False, encoding='utf-8') as tmp:
-                tmp.write(content)
-                temp_path = tmp.name
+            # Only write a temp copy when something changed; a document that already
+            # sets its margins and has no Sys.Date() is rendered in place
+            render_path = full_input_path
+            if content != original:
+                temp_path = write_temp_rmd(content, full_input_path.parent)
+                render_path = temp_path
             
+            # json.dumps quotes and escapes each path the way R string literals expect,
+            # so Windows backslashes and quotes in filenames survive
             r_expr = (
                 "rmarkdown::render("
-                f"\"{temp_path}\", "
+                f"{json.dumps(os.fspath(render_path))}, "
                 "output_format=\"pdf_document\", "
-                f"output_file=\"{pdf_name}\", "
-                f"output_dir=\"{str(output_dir)}\")"
+                f"output_file={json.dumps(pdf_name)}, "
+                f"output_dir={json.dumps(output_dir_str)})"
             )
             cmd = [
-                "Rscript",
+                find_tool("Rscript") or "Rscript",
                 "-e",
                 r_expr,
             ]
             print(f"Converting '{full_input_path}' to '{full_output_path}' using rmarkdown...")
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = run_tool(cmd)
             if result.returncode == 0 and full_output_path.exists():
                 print(f"Successfully converted to '{full_output_path}'")
+                if cache_pdf is not None:
+                    store_cached_pdf(full_output_path, cache_pdf)
                 # Clean up temp file
                 if temp_path and os.path.exists(temp_path):
                     os.unlink(temp_path)
@@ -138,7 +444,7 @@ def convert_rmd_to_pdf(rmd_path: str, output_path: str | None = None,
             else:
                 # Surface stderr for easier debugging
                 if result.stderr:
-                    print(f"rmarkdown stderr: {result.stderr.strip()}")
+                    print(f"rmarkdown stderr: {decode_stderr(result.stderr)}")
                 print("rmarkdown conversion did not produce output; will try pandoc fallback if available.")
         except Exception as e:
             print(f"rmarkdown failed with error: {e}")
@@ -149,124 +455,70 @@ def convert_rmd_to_pdf(rmd_path: str, output_path: str | None = None,
 
     # Fallback to pandoc (works for plain Markdown; R chunks won't execute)
     if command_exists("pandoc"):
-        import tempfile
-        header_path = None
-        modified_input_path = None
         try:
-            # Pre-process the Rmd file to break long lines
-            with open(full_input_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Replace Sys.Date() with actual date
-            content = replace_sys_date(content)
+            # Pre-process the Rmd file to break long lines, starting from the source
+            # with Sys.Date() replaced by the actual date
+            content = replace_sys_date(original)
             
             # Break long lines by inserting spaces every 80 characters for regular text
             # (but not inside code blocks or YAML headers)
             # Also escape # characters in code blocks to prevent LaTeX errors
-            lines = content.split('\n')
-            processed_lines = []
+            # The result goes to pandoc on stdin, so no temp file is written.
             in_code_block = False
             in_yaml = False
+            parts = []
             
-            for line in lines:
+            for raw_line in io.StringIO(content):
+                line = raw_line.rstrip('\n')
+                
                 # Check if we're entering/exiting code blocks
                 if line.strip().startswith('```'):
                     in_code_block = not in_code_block
-                    processed_lines.append(line)
-                    continue
-                
                 # Check if we're in YAML header
-                if line.strip() == '---':
+                elif line.strip() == '---':
                     in_yaml = not in_yaml
-                    processed_lines.append(line)
-                    continue
-                
-                if in_code_block:
-                    # Escape special LaTeX characters in code blocks
-                    # Double backslashes first (so \n becomes \\n)
-                    line = line.replace('\\', '\\\\')
-                    # Escape $ to prevent math mode interpretation
-                    line = line.replace('$', '\\$')
-                    # Escape # to prevent macro parameter errors
-                    line = line.replace('#', '\\#')
-                    processed_lines.append(line)
+                elif in_code_block:
+                    # Escape special LaTeX characters in code blocks, in one pass
+                    line = line.translate(_LATEX_CODE_ESCAPES)
                 elif not in_yaml:
                     # Break very long lines (over 70 chars) at word boundaries
                     if len(line) > 70 and not line.strip().startswith('#'):
                         # Insert a line break after appropriate length
                         words = line.split()
                         if len(words) > 1:
-                            current_line = ""
-                            for word in words:
-                                if len(current_line) + len(word) + 1 > 70 and current_line:
-                                    processed_lines.append(current_line)
-                                    current_line = word
-                                else:
-                                    current_line = current_line + " " + word if current_line else word
-                            if current_line:
-                                processed_lines.append(current_line)
-                        else:
-                            processed_lines.append(line)
-                    else:
-                        processed_lines.append(line)
-                else:
-                    processed_lines.append(line)
-            
-            modified_content = '\n'.join(processed_lines)
-            
-            # Create a temporary LaTeX header for better text wrapping
-            header_content = r"""\usepackage{microtype}
-\usepackage{xurl}
-\usepackage{fvextra}
-\usepackage{seqsplit}
-\usepackage{url}
-\PassOptionsToPackage{hyphens}{url}
-\sloppy
-\emergencystretch=3em
-\setlength{\emergencystretch}{3em}
-\hyphenpenalty=50
-\hbadness=10000
-\tolerance=9999
-\overfullrule=0pt
-\interlinepenalty=10000
-\pretolerance=1000
-"""
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.tex', delete=False, encoding='utf-8') as tmp:
-                tmp.write(header_content)
-                header_path = tmp.name
-            
-            # Create temp modified Rmd file
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.Rmd', delete=False, encoding='utf-8') as tmp:
-                tmp.write(modified_content)
-                modified_input_path = tmp.name
+                            line = '\n'.join(textwrap.wrap(
+                                ' '.join(words), 70,
+                                break_long_words=False, break_on_hyphens=False))
+                
+                parts.append(line)
+                if raw_line.endswith('\n'):
+                    parts.append('\n')
             
             cmd = [
-                "pandoc",
-                modified_input_path,
+                find_tool("pandoc") or "pandoc",
+                "-",  # read the preprocessed markdown from stdin
                 "-f", "markdown",  # Use standard markdown (math will work in text, code blocks are protected)
                 "-o",
-                str(full_output_path),
+                output_path_str,
                 "--pdf-engine=xelatex",
                 "--standalone",
                 "--syntax-highlighting=none",  # Disable highlighting to use plain verbatim
                 "-V", "geometry:margin=1in",  # Set 1 inch margins
                 "-V", "fontsize=11pt",  # Set readable font size
-                "-H", header_path,  # Include LaTeX header for text wrapping
+                "-H", pandoc_header_path(),  # Include LaTeX header for text wrapping
             ]
+            if fast_mode():
+                cmd += ["--pdf-engine-opt=-output-driver=xdvipdfmx -z0",
+                        "--pdf-engine-opt=-interaction=batchmode"]
             print(f"Converting '{full_input_path}' to '{full_output_path}' using pandoc...")
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            # Clean up temp files
-            if os.path.exists(header_path):
-                os.unlink(header_path)
-            if os.path.exists(modified_input_path):
-                os.unlink(modified_input_path)
+            result = run_tool(cmd, input=''.join(parts).encode('utf-8'))
             
             if result.returncode == 0 and full_output_path.exists():
+                # Not cached: the R chunks didn't run, so this PDF is only a stand-in
                 print(f"Successfully converted to '{full_output_path}'")
                 return True
             else:
-                print(f"pandoc failed: {result.stderr.strip() if result.stderr else 'unknown error'}")
+                print(f"pandoc failed: {decode_stderr(result.stderr) or 'unknown error'}")
                 return False
         except FileNotFoundError:
             print("Error: pandoc not found.")
@@ -274,12 +526,6 @@ def convert_rmd_to_pdf(rmd_path: str, output_path: str | None = None,
         except Exception as e:
             print(f"Unexpected error running pandoc: {e}")
             return False
-        finally:
-            # Clean up temp files on error
-            if header_path and os.path.exists(header_path):
-                os.unlink(header_path)
-            if modified_input_path and os.path.exists(modified_input_path):
-                os.unlink(modified_input_path)
 
     print("Neither Rscript (rmarkdown) nor pandoc found. Please install one of them to convert .Rmd to PDF.")
     print("- Install R + rmarkdown: Rscript -e 'install.packages(\"rmarkdown\")'")
@@ -287,14 +533,110 @@ def convert_rmd_to_pdf(rmd_path: str, output_path: str | None = None,
     return False
 
 
+def render_rmd_batch(rmd_names: list[str], input_dir: Path, output_dir: Path,
+                     use_cache: bool = True) -> list[str]:
+    """Render several .Rmd files to PDF in a single Rscript process.
+
+    Starting R and loading rmarkdown costs seconds, which dominates for small
+    documents, so a batch pays it once instead of once per file. Each document is
+    rendered in a fresh environment, and a failure in one does not stop the rest.
+
+    Args:
+        rmd_names: .Rmd filenames inside input_dir
+        input_dir: Input directory
+        output_dir: Output directory (must already exist)
+        use_cache: Restore unchanged documents from the cache and cache new renders
+
+    Returns:
+        list[str]: Names that did not produce a PDF. The caller retries these one
+        at a time, which also gives them the pandoc fallback.
+    """
+    temp_paths = []
+    jobs = []
+    # Names actually sent to R, with the cache entry each render should be saved to
+    pending = {}
+    try:
+        for name in rmd_names:
+            render_path = str(input_dir / name)
+            with open(render_path, 'r', encoding='utf-8') as f:
+                original = f.read()
+            content = prepare_rmd_content(original)
+            pdf_name = f"{Path(name).stem}.pdf"
+            cache_pdf = cached_pdf_path(content) if use_cache else None
+            if cache_pdf is not None and restore_cached_pdf(cache_pdf, output_dir / pdf_name):
+                continue
+            pending[name] = cache_pdf
+            if content != original:
+                render_path = write_temp_rmd(content, input_dir)
+                temp_paths.append(render_path)
+            # json.dumps gives a correctly escaped double-quoted string, which R reads as-is
+            jobs.append(f"c({json.dumps(render_path)}, {json.dumps(pdf_name)})")
+        if not jobs:
+            return []
+
+        r_script = (
+            f"for (job in list({', '.join(jobs)})) tryCatch(\n"
+            "  rmarkdown::render(job[1], output_format=\"pdf_document\", output_file=job[2],\n"
+            f"                    output_dir={json.dumps(str(output_dir))}, envir=new.env()),\n"
+            "  error=function(e) message(conditionMessage(e)))\n"
+        )
+        # The driver goes in a script file rather than -e, so a large folder can't
+        # run into the OS limit on command-line length
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.R', delete=False,
+                                         encoding='utf-8') as tmp:
+            tmp.write(r_script)
+            temp_paths.append(tmp.name)
+        print(f"Converting {len(jobs)} file(s) in '{input_dir}' using rmarkdown...")
+        started = time.time()
+        result = run_tool([find_tool("Rscript") or "Rscript", tmp.name])
+    except Exception as e:
+        print(f"rmarkdown batch failed with error: {e}")
+        return list(rmd_names)
+    finally:
+        for temp_path in temp_paths:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+    # A PDF left over from an earlier run doesn't count: the batch exits 0 even when
+    # a document fails, so check each output was written by this run (1s of slack
+    # for filesystem timestamp granularity)
+    failed = []
+    for name, cache_pdf in pending.items():
+        full_output_path = output_dir / f"{Path(name).stem}.pdf"
+        try:
+            fresh = full_output_path.stat().st_mtime >= started - 1
+        except FileNotFoundError:
+            fresh = False
+        if fresh:
+            print(f"Successfully converted to '{full_output_path}'")
+            if cache_pdf is not None:
+                store_cached_pdf(full_output_path, cache_pdf)
+        else:
+            failed.append(name)
+    if failed and result.stderr:
+        print(f"rmarkdown stderr: {decode_stderr(result.stderr)}")
+    return failed
+
+
 def main():
     parser = argparse.ArgumentParser(description="Convert R Markdown files to PDF")
     parser.add_argument("rmd_file", nargs="?", help="R Markdown file to convert (optional)")
     parser.add_argument("output_file", nargs="?", help="Output PDF filename (optional)")
     parser.add_argument("--input-dir", default="input", help="Input directory (default: input)")
     parser.add_argument("--output-dir", default="output", help="Output directory (default: output)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Files to render at once when converting a folder, capped at "
+                             "the CPU count (default: 1)")
+    parser.add_argument("--fast", action="store_true",
+                        help="Skip PDF compression in the pandoc fallback for faster, larger "
+                             "PDFs (same as setting FILECONV_FAST=1)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always re-render, even if the document is unchanged since "
+                             "the last run")
     
     args = parser.parse_args()
+    if args.fast:
+        os.environ['FILECONV_FAST'] = '1'
     
     # Set up directories
     input_dir = Path(args.input_dir)
@@ -303,12 +645,13 @@ def main():
     
     if args.rmd_file:
         # Convert specific file
-        success = convert_rmd_to_pdf(args.rmd_file, args.output_file, input_dir, output_dir)
+        success = _convert_rmd_to_pdf(args.rmd_file, args.output_file, input_dir, output_dir,
+                                      create_output_dir=True, use_cache=not args.no_cache)
         if not success:
             sys.exit(1)
     else:
         # convert all .Rmd files in input/
-        rmd_files = sorted(p for p in input_dir.glob("*.Rmd"))
+        rmd_files = list_input_files(input_dir, ".Rmd")
         if not rmd_files:
             print(f"No .Rmd files found in {input_dir} folder")
             print("Usage: python Rmd_pdf.py <file.Rmd> [output.pdf] [--input-dir DIR] [--output-dir DIR]")
@@ -316,11 +659,26 @@ def main():
             print("Example: python Rmd_pdf.py report.Rmd my_report.pdf")
             print("Example: python Rmd_pdf.py --input-dir myinput --output-dir myoutput")
             return
-        any_failed = False
-        for rmd in rmd_files:
-            ok = convert_rmd_to_pdf(rmd.name, None, input_dir, output_dir)
-            if not ok:
-                any_failed = True
+        # Rendering is almost all time spent waiting on R/LaTeX subprocesses, so
+        # threads are enough to overlap them. At most one job per CPU, since each
+        # LaTeX run is CPU-bound.
+        jobs = max(1, min(args.jobs, os.cpu_count() or 1, len(rmd_files)))
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            # One R session per job; anything it could not render is retried per
+            # file below
+            if len(rmd_files) > 1 and command_exists("Rscript"):
+                groups = [rmd_files[i::jobs] for i in range(jobs)]
+                failed = executor.map(
+                    lambda group: render_rmd_batch(group, input_dir, output_dir,
+                                                   use_cache=not args.no_cache),
+                    groups)
+                rmd_files = sorted(name for group in failed for name in group)
+            results = executor.map(
+                lambda rmd: _convert_rmd_to_pdf(rmd, None, input_dir, output_dir,
+                                                create_output_dir=False,
+                                                use_cache=not args.no_cache),
+                rmd_files)
+            any_failed = not all(results)
         if any_failed:
             sys.exit(1)
 
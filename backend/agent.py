@@ -9,43 +9,124 @@ from agents.stream_events import RawResponsesStreamEvent
 from agents.tracing import set_tracing_disabled
 from openai.types.responses import ResponseTextDeltaEvent
 
-# Import conversion functions directly from scripts.
-#
-# Two shapes show up here:
-#   - Batch converters take no arguments. They process every matching file in
-#     input/ and return a summary string.
-#   - Single-file converters take a filename (relative to input/) and return a bool.
-from combine_files import combine_files
-from csv_md import convert_csv_to_markdown
-from csv_xlsx import convert_csv_to_xlsx
-from docx_pdf import convert_docx_to_pdf
-from heic_jpg import convert_heic_to_jpg
-from heic_md import convert_heic_to_markdown
-from html_pdf import convert_html_to_pdf
-from ipynb_pdf import convert_notebook_to_pdf
-from jpg_md import convert_jpg_to_markdown
-from jpg_ocr import convert_jpg_to_ocr
-from jpg_pdf import convert_jpg_to_pdf
-from md_pdf import convert_md_to_pdf
-from openai_pdf_md import convert_pdf_to_markdown_openai
-from pdf_md import convert_pdf_to_markdown
-from png_pdf import convert_png_to_pdf
-from pptx_md import convert_pptx_to_markdown
-from pptx_pdf import convert_pptx_to_pdf
-from R_Rmd import convert_r_to_rmd
-from Rmd_pdf import convert_rmd_to_pdf
-from sql_pdf import convert_sql_files
-from ss_txt import convert_screenshots_to_text
-from txt_pdf import convert_txt_to_pdf
-from xlsx_csv import convert_xlsx_to_csv
-
 from pathlib import Path
+import ast
+import importlib
+import importlib.util
+import inspect
 import os
 import asyncio
 
-# File reading tool
+
+# Single-file conversions that succeeded this session:
+# (converter, input file, output file) -> (mtime_ns, size) of the input at the time
+converted_files = {}
+
+
+def conversion_stamp(func_name: str, arguments: dict, input_param: str, output_suffix: str):
+    """Cache key and input stamp for a call to a single-file converter.
+
+    Mirrors how the converters resolve their paths: a relative input is looked up in
+    input/, and the output is the given filename, or the input stem plus
+    output_suffix, in output/ (or the input_dir/output_dir the call passed).
+
+    Returns:
+        tuple: (key, stamp), or (None, None) if the input can't be stat'ed
+    """
+    script_dir = Path(__file__).parent
+    input_path = Path(arguments[input_param])
+    if not input_path.is_absolute():
+        input_path = Path(arguments.get('input_dir') or script_dir / "input") / input_path
+    output_name = arguments.get('output_path')
+    output_name = Path(output_name).name if output_name else input_path.stem + output_suffix
+    output_file = Path(arguments.get('output_dir') or script_dir / "output") / output_name
+    try:
+        st = input_path.stat()
+    except OSError:
+        return None, None
+    return (func_name, input_path, output_file), (st.st_mtime_ns, st.st_size)
+
+
+def lazy_tool(module_name: str, func_name: str, output_suffix: str | None = None):
+    """Wrap a converter as a tool without importing its module until it is called.
+
+    The converter scripts import reportlab, pandas, PyMuPDF, OpenCV and the like at
+    module level, which adds seconds to agent startup. The tool schema only needs
+    the function's signature and docstring, so those are read from the source with
+    ast; the module itself is imported on the first call (and cached in sys.modules).
+
+    Single-file converters pass output_suffix. If the model asks for the same
+    conversion again in a session, the input (mtime and size) hasn't changed since it
+    succeeded and the output still exists, the call returns True without re-running.
+
+    Args:
+        module_name: Script to import the converter from, e.g. "md_pdf"
+        func_name: Name of the converter function in that script
+        output_suffix: Extension of the file a single-file converter writes, e.g. ".pdf"
+
+    Returns:
+        The function tool to register with the agent
+    """
+    source = Path(importlib.util.find_spec(module_name).origin).read_text(encoding='utf-8')
+    node = next(n for n in ast.parse(source).body
+                if isinstance(n, ast.FunctionDef) and n.name == func_name)
+
+    # Annotations are builtins (str, bool, list[str], str | None) and defaults are
+    # literals, so both can be rebuilt without the module's globals
+    annotations = {}
+    params = []
+    args = node.args.args
+    defaults = [inspect.Parameter.empty] * (len(args) - len(node.args.defaults))
+    defaults += [ast.literal_eval(d) for d in node.args.defaults]
+    for arg, default in zip(args, defaults):
+        annotation = inspect.Parameter.empty
+        if arg.annotation is not None:
+            annotation = annotations[arg.arg] = eval(ast.unparse(arg.annotation), {})
+        params.append(inspect.Parameter(arg.arg, inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                                         default=default, annotation=annotation))
+    return_annotation = inspect.Signature.empty
+    if node.returns is not None:
+        return_annotation = annotations['return'] = eval(ast.unparse(node.returns), {})
+
+    signature = inspect.Signature(params, return_annotation=return_annotation)
+
+    def tool(*args, **kwargs):
+        key = stamp = None
+        if output_suffix is not None:
+            key, stamp = conversion_stamp(func_name, signature.bind(*args, **kwargs).arguments,
+                                          params[0].name, output_suffix)
+            if stamp is not None and converted_files.get(key) == stamp and key[2].exists():
+                print(f"'{key[1].name}' is unchanged since it was converted to '{key[2]}'")
+                return True
+        converter = getattr(importlib.import_module(module_name), func_name)
+        result = converter(*args, **kwargs)
+        if result is True and stamp is not None:
+            converted_files[key] = stamp
+        return result
+
+    tool.__name__ = tool.__qualname__ = func_name
+    tool.__doc__ = ast.get_docstring(node)
+    tool.__signature__ = signature
+    tool.__annotations__ = annotations
+    return function_tool(tool)
+
+
+# Most characters read_file hands to the model. Anything longer is cut off with a
+# marker: a whole large file would cost far more prompt tokens than it's worth.
+MAX_READ_CHARS = 64 * 1024
+
+
+def read_text(path: Path, limit: int) -> str:
+    """Read up to limit characters of a UTF-8 text file (blocking; read_file runs it on
+    a worker thread)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read(limit)
+
+
+# File reading tool. Async, so a large read runs on a worker thread instead of
+# blocking the event loop that streams the agent's response.
 @function_tool
-def read_file(file_path: str) -> str:
+async def read_file(file_path: str) -> str:
     """
     Read the contents of a file from the input folder or absolute path.
 
@@ -53,7 +134,7 @@ def read_file(file_path: str) -> str:
         file_path: The path to the file. Can be relative to the project directory or an absolute path.
 
     Returns:
-        File content or error message
+        File content (truncated after the first 64K characters) or error message
     """
     script_dir = Path(__file__).parent
 
@@ -64,9 +145,11 @@ def read_file(file_path: str) -> str:
         full_path = script_dir / file_path
 
     try:
-        with open(full_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            return f"File content from {file_path}:\n\n{content}"
+        # Read one character past the cap to tell whether anything was cut off
+        content = await asyncio.to_thread(read_text, full_path, MAX_READ_CHARS + 1)
+        if len(content) > MAX_READ_CHARS:
+            content = content[:MAX_READ_CHARS] + "\n\n[...truncated...]\n"
+        return f"File content from {file_path}:\n\n{content}"
     except FileNotFoundError:
         return f"Error: File not found at {full_path}"
     except PermissionError:
@@ -130,34 +213,39 @@ agent = Agent(
         read_file,   # Already decorated with @function_tool
         list_files,  # Already decorated with @function_tool
 
+        # Converters, imported from their scripts on first use. Two shapes show up:
+        #   - Batch converters take no arguments. They process every matching file in
+        #     input/ and return a summary string.
+        #   - Single-file converters take a filename (relative to input/) and return a bool.
+
         # Batch converters: no arguments, they process everything in input/
-        function_tool(convert_csv_to_markdown),
-        function_tool(convert_csv_to_xlsx),
-        function_tool(convert_xlsx_to_csv),
-        function_tool(convert_pdf_to_markdown),
-        function_tool(convert_pdf_to_markdown_openai),
-        function_tool(convert_pptx_to_markdown),
-        function_tool(convert_pptx_to_pdf),
-        function_tool(convert_heic_to_jpg),
-        function_tool(convert_heic_to_markdown),
-        function_tool(convert_jpg_to_markdown),
-        function_tool(convert_jpg_to_pdf),
-        function_tool(convert_jpg_to_ocr),
-        function_tool(convert_png_to_pdf),
-        function_tool(convert_sql_files),
-        function_tool(convert_screenshots_to_text),
+        lazy_tool("csv_md", "convert_csv_to_markdown"),
+        lazy_tool("csv_xlsx", "convert_csv_to_xlsx"),
+        lazy_tool("xlsx_csv", "convert_xlsx_to_csv"),
+        lazy_tool("pdf_md", "convert_pdf_to_markdown"),
+        lazy_tool("openai_pdf_md", "convert_pdf_to_markdown_openai"),
+        lazy_tool("pptx_md", "convert_pptx_to_markdown"),
+        lazy_tool("pptx_pdf", "convert_pptx_to_pdf"),
+        lazy_tool("heic_jpg", "convert_heic_to_jpg"),
+        lazy_tool("heic_md", "convert_heic_to_markdown"),
+        lazy_tool("jpg_md", "convert_jpg_to_markdown"),
+        lazy_tool("jpg_pdf", "convert_jpg_to_pdf"),
+        lazy_tool("jpg_ocr", "convert_jpg_to_ocr"),
+        lazy_tool("png_pdf", "convert_png_to_pdf"),
+        lazy_tool("sql_pdf", "convert_sql_files"),
+        lazy_tool("ss_txt", "convert_screenshots_to_text"),
 
         # Single-file converters: take a filename from input/
-        function_tool(convert_md_to_pdf),
-        function_tool(convert_docx_to_pdf),
-        function_tool(convert_txt_to_pdf),
-        function_tool(convert_html_to_pdf),
-        function_tool(convert_notebook_to_pdf),
-        function_tool(convert_r_to_rmd),
-        function_tool(convert_rmd_to_pdf),
+        lazy_tool("md_pdf", "convert_md_to_pdf", ".pdf"),
+        lazy_tool("docx_pdf", "convert_docx_to_pdf", ".pdf"),
+        lazy_tool("txt_pdf", "convert_txt_to_pdf", ".pdf"),
+        lazy_tool("html_pdf", "convert_html_to_pdf", ".pdf"),
+        lazy_tool("ipynb_pdf", "convert_notebook_to_pdf", ".pdf"),
+        lazy_tool("R_Rmd", "convert_r_to_rmd", ".Rmd"),
+        lazy_tool("Rmd_pdf", "convert_rmd_to_pdf", ".pdf"),
 
         # Combines several files into one
-        function_tool(combine_files),
+        lazy_tool("combine_files", "combine_files"),
         ],
 
 
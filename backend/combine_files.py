@@ -5,9 +5,14 @@ images and PDFs are combined into one PDF, and text files are concatenated.
 Writes the combined result to output/.
 """
 
+import codecs
+import io
+import mmap
 import os
 import sys
 import re
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
@@ -20,7 +25,13 @@ except ImportError:
     HAS_PIL = False
 
 try:
-    from pypdf import PdfWriter, PdfReader
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from pypdf import PdfWriter
     HAS_PDF = True
 except ImportError:
     try:
@@ -33,10 +44,14 @@ except ImportError:
         
 
 
+# Compiled once rather than looked up in re's cache for every file being sorted
+_SPLIT_DIGITS = re.compile(r'(\d+)')
+
+
 def natural_sort_key(path):
     """Extract numbers from filename for natural sorting (Q1, Q2, Q10 instead of Q1, Q10, Q2)"""
-    return [int(text) if text.isdigit() else text.lower() 
-            for text in re.split(r'(\d+)', str(path.name))]
+    return [int(text) if text.isdigit() else text.lower()
+            for text in _SPLIT_DIGITS.split(path.name)]
 
 
 # setup file directories
@@ -53,15 +68,107 @@ def setup_directories():
     return input_dir, output_dir
 
 
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp'})
+
+# Extension -> file type; anything not listed is treated as text
+FILE_TYPES = {ext: 'image' for ext in IMAGE_EXTENSIONS} | {'.pdf': 'pdf'}
+
+
 def get_file_type(file_path: Path) -> str:
     """Detect file type from extension."""
-    ext = file_path.suffix.lower()
-    if ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp']:
-        return 'image'
-    elif ext == '.pdf':
-        return 'pdf'
-    else:
-        return 'text'
+    return FILE_TYPES.get(file_path.suffix.lower(), 'text')
+
+
+def normalize_newlines(chunk: bytes, carried_cr: bool) -> tuple[bytes, bool]:
+    """Turn \r\n and lone \r line endings in one chunk of a file into \n.
+
+    Matches what reading the file in text mode gives. A \r at the end of the chunk
+    may be the first half of a \r\n split across chunks, so it's held back and
+    passed into the next call as carried_cr.
+
+    Returns:
+        (normalized bytes, whether a trailing \r was held back)
+    """
+    if carried_cr:
+        chunk = b"\r" + chunk
+    if b"\r" not in chunk:
+        return chunk, False
+    carry = chunk.endswith(b"\r")
+    if carry:
+        chunk = chunk[:-1]
+    return chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n"), carry
+
+
+def write_all(fd: int, *chunks: bytes):
+    """Write every chunk to fd, gathered into one writev call where the OS has it."""
+    pending = [chunk for chunk in chunks if chunk]
+    if not hasattr(os, 'writev'):
+        pending = [b"".join(pending)] if pending else []
+    while pending:
+        written = os.writev(fd, pending) if hasattr(os, 'writev') else os.write(fd, pending[0])
+        # Drop whatever was written and retry the rest (short writes are rare but legal)
+        while pending and written >= len(pending[0]):
+            written -= len(pending[0])
+            pending.pop(0)
+        if written:
+            pending[0] = pending[0][written:]
+
+
+def load_image(img_path: Path):
+    """Open and fully decode an image as RGB, or RGBA if it has transparency."""
+    with Image.open(img_path) as img:
+        has_alpha = 'A' in img.getbands() or 'transparency' in img.info
+        return img.convert('RGBA' if has_alpha else 'RGB')
+
+
+def load_images(img_paths: list[Path], workers: int = 8):
+    """Decode images in order, a few at a time on a thread pool.
+
+    Decoding happens in libjpeg/libpng with the GIL released, so threads decode in
+    parallel. Images are decoded in batches of `workers`, so at most that many are
+    held in memory at once.
+    """
+    with ThreadPoolExecutor(max_workers=min(workers, len(img_paths))) as executor:
+        for start in range(0, len(img_paths), workers):
+            yield from executor.map(load_image, img_paths[start:start + workers])
+
+
+def map_file(path: Path):
+    """Memory-map a file read-only and ask the kernel to start reading it in.
+
+    Empty files can't be mapped, so they come back as an empty BytesIO.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return io.BytesIO()
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mapping, 'madvise') and hasattr(mmap, 'MADV_WILLNEED'):
+        mapping.madvise(mmap.MADV_WILLNEED)
+    return mapping
+
+
+def map_files(paths: list[Path], depth: int = 32):
+    """Yield each file memory-mapped, in order, with the next few already being read in.
+
+    The page cache serves as the buffer, so no file is copied into Python memory
+    and only the parts the caller touches are read. Up to `depth` files are mapped
+    ahead with MADV_WILLNEED, so the kernel reads them in the background while the
+    caller works on the current one. Each mapping is closed once the caller asks
+    for the next file, so use its contents before then.
+    """
+    pending = deque()
+    try:
+        for path in paths:
+            pending.append(map_file(path))
+            if len(pending) >= depth:
+                yield pending[0]
+                pending.popleft().close()
+        while pending:
+            yield pending[0]
+            pending.popleft().close()
+    finally:
+        for mapping in pending:
+            mapping.close()
 
 
 def combine_files(file_paths: list[str], output_path: str | None = None) -> bool:
@@ -72,46 +179,35 @@ def combine_files(file_paths: list[str], output_path: str | None = None) -> bool
         return False
     
     # Build full input paths - always look in input folder unless absolute path is provided
+    # - and group them by type in the same pass
     full_input_paths = []
+    file_types = defaultdict(list)
     for file_path in file_paths:
+        file_path_str = os.fspath(file_path)
         # If absolute path, use as-is; otherwise look in input folder
-        if os.path.isabs(str(file_path)):
-            full_path = Path(file_path)
+        if os.path.isabs(file_path_str):
+            full_path = Path(file_path_str)
         else:
             # Remove 'input/' or 'input\' prefix if user included it
-            file_path_str = str(file_path)
-            if file_path_str.startswith('input/'):
-                file_path_clean = file_path_str[6:]  # Remove 'input/'
-            elif file_path_str.startswith('input\\'):
-                file_path_clean = file_path_str[6:]  # Remove 'input\\'
-            else:
-                file_path_clean = file_path_str
-            full_path = input_dir / file_path_clean
+            if file_path_str[:6] in ('input/', 'input\\'):
+                file_path_str = file_path_str[6:]
+            full_path = input_dir / file_path_str
         
-        if not full_path.exists():
+        # Skip .DS_Store and other hidden/system files (a name check, so no stat needed)
+        if full_path.name.startswith('.'):
+            continue
+        try:
+            os.stat(full_path)
+        except OSError:
             print(f"Warning: File '{full_path}' not found in input folder, skipping")
             continue
         full_input_paths.append(full_path)
+        file_types[get_file_type(full_path)].append(full_path)
     
     if not full_input_paths:
         print("Error: No valid files found to combine")
         return False
     
-    # Skip .DS_Store and other hidden/system files
-    full_input_paths = [f for f in full_input_paths if not f.name.startswith('.')]
-    
-    if not full_input_paths:
-        print("Error: No valid files found to combine")
-        return False
-    
-    # Detect file types and group by type
-    file_types = {}
-    for file_path in full_input_paths:
-        file_type = get_file_type(file_path)
-        if file_type not in file_types:
-            file_types[file_type] = []
-        file_types[file_type].append(file_path)
-    
     # Determine output format and name
     if output_path is None:
         # Auto-detect output format from input files
@@ -132,8 +228,9 @@ def combine_files(file_paths: list[str], output_path: str | None = None) -> bool
             output_type = 'text'
     else:
         # User specified output - determine type from extension
-        output_name = Path(output_path).name
-        output_type = get_file_type(Path(output_name))
+        output_file = Path(output_path)
+        output_name = output_file.name
+        output_type = get_file_type(output_file)
     
     full_output_path = output_dir / output_name
     
@@ -149,27 +246,51 @@ def combine_files(file_paths: list[str], output_path: str | None = None) -> bool
                 print("Error: Pillow (PIL) is required to combine images. Install with: pip install pillow")
                 return False
             
-            images = []
-            max_width = 0
-            total_height = 0
-            
-            # Load all images
-            for img_path in file_types['image']:
-                img = Image.open(img_path)
-                images.append(img)
-                max_width = max(max_width, img.width)
-                total_height += img.height
+            # Sizes come from the file headers alone, so the canvas is allocated before
+            # anything is decoded and each image is pasted as soon as it's ready,
+            # rather than holding every decoded image alongside the canvas
+            image_paths = file_types['image']
+            sizes = []
+            for img_path in image_paths:
+                with Image.open(img_path) as img:
+                    sizes.append(img.size)
+            max_width = max(width for width, _ in sizes)
+            total_height = sum(height for _, height in sizes)
             
-            # Create new image with combined dimensions
-            combined = Image.new('RGB', (max_width, total_height), color='white')
+            if HAS_NUMPY:
+                # When every image is full width they tile the canvas exactly, so it
+                # needn't be filled with white first
+                if all(width == max_width for width, _ in sizes):
+                    canvas = np.empty((total_height, max_width, 3), dtype=np.uint8)
+                else:
+                    canvas = np.full((total_height, max_width, 3), 255, dtype=np.uint8)
+            else:
+                combined = Image.new('RGB', (max_width, total_height), color='white')
             
-            # Paste images vertically
+            # Stack images vertically
             y_offset = 0
-            for img in images:
+            for img in load_images(image_paths):
                 # Center image if narrower than max width
                 x_offset = (max_width - img.width) // 2
-                combined.paste(img, (x_offset, y_offset))
+                if HAS_NUMPY:
+                    # A single slice assignment instead of a PIL paste
+                    region = canvas[y_offset:y_offset + img.height,
+                                    x_offset:x_offset + img.width]
+                    pixels = np.asarray(img)
+                    if img.mode == 'RGBA':
+                        # Blend onto the white background in one vectorized pass
+                        alpha = pixels[..., 3:].astype(np.uint16)
+                        region[...] = ((pixels[..., :3] * alpha + 255 * (255 - alpha) + 127)
+                                       // 255)
+                    else:
+                        region[...] = pixels
+                else:
+                    # An RGBA image masks itself, so it's blended onto the background too
+                    combined.paste(img, (x_offset, y_offset),
+                                   img if img.mode == 'RGBA' else None)
                 y_offset += img.height
+            if HAS_NUMPY:
+                combined = Image.fromarray(canvas)
             
             # Save combined image
             combined.save(full_output_path)
@@ -186,11 +307,16 @@ def combine_files(file_paths: list[str], output_path: str | None = None) -> bool
             
             # Try using pypdf (newer)
             try:
+                # append() brings each document's pages across in one call, sharing
+                # their resources by reference instead of copying page by page
                 writer = PdfWriter()
-                for pdf_path in file_types['pdf']:
-                    reader = PdfReader(pdf_path)
-                    for page in reader.pages:
-                        writer.add_page(page)
+                for pdf_data in map_files(file_types['pdf']):
+                    # Outlines were never carried over by the page-by-page merge, so
+                    # skip importing them. append() copies everything it needs into
+                    # the writer, so the mapping can be closed afterwards.
+                    writer.append(pdf_data, import_outline=False)
+                # Store fonts and images that repeat across the inputs only once
+                writer.compress_identical_objects()
                 with open(full_output_path, 'wb') as outfile:
                     writer.write(outfile)
             except NameError:
@@ -204,26 +330,73 @@ def combine_files(file_paths: list[str], output_path: str | None = None) -> bool
                     writer.write(outfile)
         
         else:
-            # Combine text files
-            with open(full_output_path, 'w', encoding='utf-8') as outfile:
+            # Combine text files. Bytes are streamed straight across in 1 MB chunks on
+            # raw file descriptors, so a large file is never held in memory or copied
+            # through Python's buffered I/O. Line endings are normalized to \n, as
+            # text-mode reading did. Each file's separator goes out in the same
+            # write as its first chunk. Every chunk is checked with an incremental
+            # UTF-8 decoder; a file that turns out not to be text is cut back out of
+            # the output and skipped with a warning, as are images and PDFs.
+            separator = ("=" * 80).encode('utf-8')
+            binary = getattr(os, 'O_BINARY', 0)  # no newline translation on Windows
+            out_fd = os.open(full_output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | binary,
+                             0o644)
+            try:
                 for i, input_path in enumerate(full_input_paths):
                     # Add separator between files (except before first file)
+                    file_header = b""
                     if i > 0:
-                        outfile.write("\n" + "=" * 80 + "\n")
-                        outfile.write(f"File: {input_path.name}\n")
-                        outfile.write("=" * 80 + "\n\n")
+                        file_header = b"".join((b"\n", separator, b"\n",
+                                                f"File: {input_path.name}\n".encode('utf-8'),
+                                                separator, b"\n\n"))
+                    header = file_header
                     
-                    # Read and write file content
+                    # Binary formats never belong in the text output
+                    file_type = get_file_type(input_path)
+                    if file_type != 'text':
+                        write_all(out_fd, header)
+                        print(f"Warning: Skipping '{input_path.name}': "
+                              f"{file_type} files can't be combined as text")
+                        continue
+
+                    # Copy file content
                     try:
-                        with open(input_path, 'r', encoding='utf-8') as infile:
-                            content = infile.read()
-                            outfile.write(content)
-                            # Add newline at end if file doesn't end with one
-                            if content and not content.endswith('\n'):
-                                outfile.write('\n')
-                    except Exception as e:
+                        in_fd = os.open(input_path, os.O_RDONLY | binary)
+                    except OSError as e:
+                        write_all(out_fd, header)
                         print(f"Warning: Error reading '{input_path.name}': {e}")
                         continue
+                    start = os.lseek(out_fd, 0, os.SEEK_CUR)
+                    try:
+                        decoder = codecs.getincrementaldecoder('utf-8')()
+                        last_byte = b""
+                        carried_cr = False
+                        while chunk := os.read(in_fd, 1024 * 1024):
+                            decoder.decode(chunk)
+                            data, carried_cr = normalize_newlines(chunk, carried_cr)
+                            write_all(out_fd, header, data)
+                            header = b""
+                            if data:
+                                last_byte = data[-1:]
+                        decoder.decode(b"", final=True)
+                        if carried_cr:
+                            # The file ended in a lone \r
+                            write_all(out_fd, header, b"\n")
+                            header, last_byte = b"", b"\n"
+                        # Add newline at end if file doesn't end with one (the header
+                        # is still pending if the file was empty)
+                        write_all(out_fd, header, b"\n" if last_byte not in (b"", b"\n") else b"")
+                    except (OSError, UnicodeDecodeError) as e:
+                        # Drop whatever part of the file was already written, keeping
+                        # only its separator
+                        os.ftruncate(out_fd, start)
+                        os.lseek(out_fd, start, os.SEEK_SET)
+                        write_all(out_fd, file_header)
+                        print(f"Warning: Error reading '{input_path.name}': {e}")
+                    finally:
+                        os.close(in_fd)
+            finally:
+                os.close(out_fd)
         
         if full_output_path.exists():
             print(f"Successfully combined {len(full_input_paths)} file(s) into '{full_output_path}'")
@@ -241,9 +414,12 @@ def main():
     input_dir, output_dir = setup_directories()
     
     if len(sys.argv) < 2:
-        # No args: combine all files in input/ folder (skip .DS_Store and other hidden files)
-        all_files = sorted([f for f in input_dir.iterdir() if f.is_file() and not f.name.startswith('.')], 
-                          key=natural_sort_key)
+        # No args: combine all files in input/ folder (skip .DS_Store and other hidden files).
+        # scandir entries carry their file type, so this needs no stat call per file.
+        with os.scandir(input_dir) as entries:
+            all_files = sorted((Path(e.path) for e in entries
+                                if e.is_file() and not e.name.startswith('.')),
+                               key=natural_sort_key)
         if not all_files:
             print("No files found in input folder")
             print("Usage: python combine_files.py [file1] [file2] ... [output_file]")
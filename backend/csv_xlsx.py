@@ -4,8 +4,11 @@ For each .csv in input/, reads it with pandas and writes an .xlsx to output/.
 """
 
 import pandas as pd
+import xlsxwriter
 import glob
+import itertools
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 # Get the directory where this script is located
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -14,6 +17,66 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 input_folder = os.path.join(script_dir, 'input')
 output_folder = os.path.join(script_dir, 'output')
 
+# Rows read from a CSV at a time
+CHUNK_ROWS = 50_000
+
+
+def convert_one(file: str, output_folder: str) -> tuple[str, str | None, str | None]:
+    """Convert one CSV file to an XLSX file in output_folder.
+
+    Runs in a worker process, so it takes the output folder as an argument (a fresh
+    worker wouldn't see the module globals the server redirects) and returns the
+    outcome for the parent to report instead of printing it.
+
+    Returns:
+        (csv filename, xlsx filename or None, error message or None)
+    """
+    # Get just the filename (outside the try so it's always available for errors)
+    filename = os.path.basename(file)
+
+    try:
+        # Create output Excel filename
+        xlsx_filename = os.path.splitext(filename)[0] + '.xlsx'
+        xlsx_path = os.path.join(output_folder, xlsx_filename)
+
+        # Stream the CSV into the workbook in chunks. xlsxwriter's constant_memory mode
+        # flushes each row to disk as soon as the next one starts, so neither the CSV
+        # nor the workbook is ever held in memory whole. Rows are written directly
+        # because df.to_excel writes column by column, which that mode can't take.
+        chunks = pd.read_csv(file, chunksize=CHUNK_ROWS)
+        # The first chunk is read before the workbook is created, so a CSV pandas
+        # rejects doesn't leave an empty .xlsx behind (a header-only CSV still
+        # gives one, empty, chunk)
+        first = next(chunks)
+
+        # strings_to_urls off: cells are written as plain strings, as to_excel does,
+        # rather than URL-like ones becoming hyperlinks
+        workbook = xlsxwriter.Workbook(xlsx_path, {'constant_memory': True,
+                                                   'nan_inf_to_errors': True,
+                                                   'strings_to_urls': False})
+        try:
+            worksheet = workbook.add_worksheet('Sheet1')
+            # Same header style df.to_excel uses
+            header_format = workbook.add_format({'bold': True, 'border': 1,
+                                                 'align': 'center', 'valign': 'top'})
+            worksheet.write_row(0, 0, [str(c) for c in first.columns], header_format)
+            row = 1
+            for chunk in itertools.chain([first], chunks):
+                # Missing values become empty cells, as with to_excel
+                for values in chunk.astype(object).where(chunk.notna(), None).values.tolist():
+                    worksheet.write_row(row, 0, values)
+                    row += 1
+        except Exception:
+            # A later chunk failed to parse: don't leave a partial workbook behind
+            workbook.close()
+            os.remove(xlsx_path)
+            raise
+        workbook.close()
+        return filename, xlsx_filename, None
+
+    except Exception as e:
+        return filename, None, str(e)
+
 
 def convert_csv_to_xlsx() -> str:
     """Convert all CSV files in the input folder to XLSX files in the output folder.
@@ -28,35 +91,41 @@ def convert_csv_to_xlsx() -> str:
     csv_files = glob.glob(os.path.join(input_folder, '*.csv'))
 
     if not csv_files:
-        # If only .xlsx files are present, notify they're already Excel
-        xlsx_present = glob.glob(os.path.join(input_folder, '*.xlsx'))
+        # If only .xlsx files are present, notify they're already Excel. any() stops
+        # the directory scan at the first one.
+        try:
+            with os.scandir(input_folder) as entries:
+                xlsx_present = any(e.name.endswith('.xlsx') and not e.name.startswith('.')
+                                   for e in entries)
+        except FileNotFoundError:
+            xlsx_present = False
         if xlsx_present:
             return "That file is already in Excel format"
         return "No CSV files found in input folder"
 
     print(f"Found {len(csv_files)} CSV file(s)")
 
+    # Building the workbook is CPU-bound Python (pandas + the Excel writer), so
+    # several files are converted in separate processes rather than threads
+    if len(csv_files) > 1:
+        workers = min(os.cpu_count() or 1, len(csv_files))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(convert_one, csv_files,
+                                        [output_folder] * len(csv_files),
+                                        chunksize=max(1, len(csv_files) // (workers * 4))))
+    else:
+        results = [convert_one(csv_files[0], output_folder)]
+
     converted = []
     errors = []
 
-    for file in csv_files:
-        # Get just the filename (outside the try so it's always available for errors)
-        filename = os.path.basename(file)
-
-        try:
-            # Create output Excel filename
-            xlsx_filename = os.path.splitext(filename)[0] + '.xlsx'
-            xlsx_path = os.path.join(output_folder, xlsx_filename)
-
-            # Read CSV file and convert to Excel
-            df = pd.read_csv(file)
-            df.to_excel(xlsx_path, index=False)
+    for filename, xlsx_filename, error in results:
+        if error is None:
             print(f"Converted {filename} to {xlsx_filename}")
             converted.append(xlsx_filename)
-
-        except Exception as e:
-            print(f"Error converting {filename}: {e}")
-            errors.append(f"{filename}: {e}")
+        else:
+            print(f"Error converting {filename}: {error}")
+            errors.append(f"{filename}: {error}")
 
     if not converted:
         return f"No files converted. {len(errors)} failed: {'; '.join(errors)}"
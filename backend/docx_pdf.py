@@ -7,6 +7,9 @@ a PDF with reportlab, carrying over paragraphs, tables, and images. Writes to ou
 import os
 import sys
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from html import escape
+from itertools import repeat
 from pathlib import Path
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
@@ -14,9 +17,29 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 from docx import Document
-from docx.oxml.ns import qn
+from docx.oxml.ns import nsmap, qn
+from docx.table import Table as DocxTable
+from docx.text.paragraph import Paragraph as DocxParagraph
+from lxml import etree
 import io
 
+# Style for every converted table. Built once and shared, since setStyle() only
+# reads the commands.
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('TOPPADDING', (0, 1), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+])
+
 
 # Create input and output directories if they don't exist
 def setup_directories(input_dir="input", output_dir="output"):
@@ -29,36 +52,53 @@ def setup_directories(input_dir="input", output_dir="output"):
     return input_path, output_path
 
 
-# convert a docx table to a pdf table and add it to the story
-def add_table_to_story(story, table):
-    # Get table data
+# The runs and hyperlinks that make up a paragraph's text. Compiled once, since
+# python-docx's p.text builds and evaluates this XPath on every call.
+PARAGRAPH_RUNS = etree.XPath('w:r | w:hyperlink', namespaces={'w': nsmap['w']})
+
+# Drawings in a run and the embedded pictures (blips) in a drawing, compiled once
+# rather than on every run of every paragraph
+RUN_DRAWINGS = etree.XPath('.//w:drawing', namespaces={'w': nsmap['w']})
+DRAWING_BLIPS = etree.XPath('.//a:blip', namespaces={'a': nsmap['a']})
+
+
+# Text of a table cell (<w:tc>) on one line: its paragraphs joined the way
+# python-docx's cell.text joins them, with newlines replaced by spaces
+def cell_text(tc):
+    return ' '.join(''.join(e.text for e in PARAGRAPH_RUNS(p)) for p in tc.p_lst).replace('\n', ' ')
+
+
+# Get the text of each cell of a docx table, row by row, straight from the XML.
+# Matches row.cells: a horizontally merged cell repeats once per grid column it
+# spans, and a vertically merged one repeats the text of the cell above it.
+def table_data(table):
     data = []
-    for row in table.rows:
+    above = {}  # grid column -> text covering it in the previous row
+    for tr in table._tbl.tr_lst:
         row_data = []
-        for cell in row.cells:
-            # Get text from cell, replacing newlines with spaces
-            cell_text = cell.text.replace('\n', ' ')
-            row_data.append(cell_text)
+        covering = {}
+        col = tr.grid_before
+        for tc in tr.tc_lst:
+            span = tc.grid_span
+            text = above.get(col, '') if tc.vMerge == 'continue' else cell_text(tc)
+            row_data.extend([text] * span)
+            covering.update(dict.fromkeys(range(col, col + span), text))
+            col += span
+        above = covering
         data.append(row_data)
+    return data
+
+
+# convert a docx table to a pdf table and add it to the story
+def add_table_to_story(story, table):
+    # Get table data
+    data = table_data(table)
     
     # Create PDF table
     pdf_table = Table(data)
     
     # Style the table
-    pdf_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ('TOPPADDING', (0, 1), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ]))
+    pdf_table.setStyle(TABLE_STYLE)
     
     story.append(pdf_table)
     story.append(Spacer(1, 12))
@@ -74,7 +114,7 @@ def para_to_html(para):
             continue
         
         # Escape special characters
-        text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+        text = escape(text, quote=False)
         
         # Apply formatting
         if run.bold:
@@ -164,35 +204,36 @@ def convert_docx_to_pdf(docx_path: str, output_path: str | None = None, input_di
         story.append(title)
         story.append(Spacer(1, 20))
 
-        # Process document elements in order (paras and tables interleaved)
-        # Create maps for quick lookup
-        para_map = {id(para._p): para for para in docx.paragraphs}
-        table_map = {id(table._tbl): table for table in docx.tables}
-        
-        # Iterate through body elements in document order
+        # Process document elements in order (paras and tables interleaved),
+        # wrapping each body element as it is reached
+        para_tag = qn('w:p')
+        table_tag = qn('w:tbl')
+        embed_attr = qn('r:embed')
+        rels = docx.part.rels
+
         for element in docx.element.body:
-            elem_id = id(element)
-            
             # Check if it's a paragraph
-            if elem_id in para_map:
-                para = para_map[elem_id]
-                
+            if element.tag == para_tag:
+                para = DocxParagraph(element, docx)
+
                 # Process runs in order to maintain text/image order
                 text_runs = []
                 has_formatting = False
+                has_drawing = False
                 
                 for run in para.runs:
                     # Check if this run contains an image
                     has_image = False
                     try:
-                        drawings = run._element.xpath('.//w:drawing')
+                        drawings = RUN_DRAWINGS(run._element)
+                        has_drawing = has_drawing or bool(drawings)
                         for drawing in drawings:
-                            blips = drawing.xpath('.//a:blip')
+                            blips = DRAWING_BLIPS(drawing)
                             for blip in blips:
-                                rel_id = blip.get(qn('r:embed'))
-                                if rel_id and rel_id in docx.part.rels:
+                                rel_id = blip.get(embed_attr)
+                                if rel_id and rel_id in rels:
                                     has_image = True
-                                    rel = docx.part.rels[rel_id]
+                                    rel = rels[rel_id]
                                     img_data = rel.target_part.blob
                                     
                                     # Get image dimensions if available
@@ -235,7 +276,7 @@ def convert_docx_to_pdf(docx_path: str, output_path: str | None = None, input_di
                             text = run.text
                             if not text:
                                 continue
-                            text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+                            text = escape(text, quote=False)
                             if run.bold:
                                 text = f'<b>{text}</b>'
                             if run.italic:
@@ -248,16 +289,16 @@ def convert_docx_to_pdf(docx_path: str, output_path: str | None = None, input_di
                     else:
                         # Plain text - combine all runs
                         combined_text = ''.join(run.text for run in text_runs)
-                        escaped_text = combined_text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+                        escaped_text = escape(combined_text, quote=False)
                         story.append(Paragraph(escaped_text, normal_style))
-                elif not any(run._element.xpath('.//w:drawing') for run in para.runs):
+                elif not has_drawing:
                     # Empty paragraph with no images - add spacing
                     story.append(Spacer(1, 6))
             
             # Check if it's a table
-            elif elem_id in table_map:
+            elif element.tag == table_tag:
                 story.append(Spacer(1, 12))
-                add_table_to_story(story, table_map[elem_id])
+                add_table_to_story(story, DocxTable(element, docx))
 
         # Build PDF
         print(f"Converting '{full_input_path}' to '{full_output_path}'...")
@@ -304,12 +345,17 @@ def main():
             print("Example: python docx_pdf.py notes.docx my_notes.pdf")
             print("Example: python docx_pdf.py --input-dir myinput --output-dir myoutput")
             return
-        any_failed = False
-        for docx in docx_files:
-            ok = convert_docx_to_pdf(docx.name, None, input_dir, output_dir)
-            if not ok:
-                any_failed = True
-        if any_failed:
+        # Building the story and laying it out in ReportLab is CPU-bound Python,
+        # so files are converted in separate processes rather than threads
+        names = [docx.name for docx in docx_files]
+        if len(names) > 1:
+            workers = min(os.cpu_count() or 1, len(names))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(convert_docx_to_pdf, names, repeat(None),
+                                            repeat(input_dir), repeat(output_dir)))
+        else:
+            results = [convert_docx_to_pdf(names[0], None, input_dir, output_dir)]
+        if not all(results):
             sys.exit(1)
 
 
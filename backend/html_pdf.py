@@ -9,6 +9,7 @@ Writes to output/.
 import os
 import sys
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from shutil import which
 
@@ -17,6 +18,53 @@ def command_exists(cmd):
     return which(cmd) is not None
 
 
+def quote_arg(arg: str) -> str:
+    """Quote one argument for a line of wkhtmltopdf --read-args-from-stdin input."""
+    return '"' + arg.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def convert_html_batch(html_files: list[Path]) -> list[Path]:
+    """Convert several .html files with a single wkhtmltopdf process.
+
+    Each file is one line of --read-args-from-stdin, so the rendering engine starts
+    once for the whole batch instead of once per file.
+
+    Args:
+        html_files (list[Path]): Absolute paths of the .html files to convert
+
+    Returns:
+        list[Path]: The files that did not produce a PDF, for the caller to retry
+    """
+    output_dir = Path(__file__).resolve().parent / "output"
+    output_dir.mkdir(exist_ok=True)
+
+    jobs = {html: output_dir / f"{html.stem}.pdf" for html in html_files}
+    # Clear stale PDFs so a file that fails this time isn't mistaken for converted
+    for pdf in jobs.values():
+        pdf.unlink(missing_ok=True)
+
+    lines = "".join(f"{quote_arg(str(html))} {quote_arg(str(pdf))}\n" for html, pdf in jobs.items())
+    print(f"Converting {len(jobs)} file(s) using wkhtmltopdf...")
+    try:
+        # stderr stays bytes and is only decoded if a file fails
+        result = subprocess.run(["wkhtmltopdf", "--read-args-from-stdin"],
+                                input=os.fsencode(lines), stdout=subprocess.DEVNULL,
+                                stderr=subprocess.PIPE)
+    except Exception as e:
+        print(f"wkhtmltopdf failed with error: {e}")
+        return list(html_files)
+
+    failed = []
+    for html, pdf in jobs.items():
+        if pdf.exists():
+            print(f"Successfully converted '{html}' to '{pdf}'")
+        else:
+            failed.append(html)
+    if failed and result.stderr:
+        print(f"wkhtmltopdf stderr: {result.stderr.decode('utf-8', errors='replace').strip()}")
+    return failed
+
+
 def convert_html_to_pdf(html_path: str, output_path: str | None = None) -> bool:
     """
     Convert an .html file to PDF.
@@ -66,13 +114,14 @@ def convert_html_to_pdf(html_path: str, output_path: str | None = None) -> bool:
                 str(full_output_path),
             ]
             print(f"Converting '{full_input_path}' to '{full_output_path}' using wkhtmltopdf...")
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
             if result.returncode == 0 and full_output_path.exists():
                 print(f"Successfully converted to '{full_output_path}'")
                 return True
             else:
                 if result.stderr:
-                    print(f"wkhtmltopdf stderr: {result.stderr.strip()}")
+                    stderr = result.stderr.decode('utf-8', errors='replace').strip()
+                    print(f"wkhtmltopdf stderr: {stderr}")
                 print("wkhtmltopdf conversion failed; will try pandoc fallback if available.")
         except Exception as e:
             print(f"wkhtmltopdf failed with error: {e}")
@@ -88,12 +137,13 @@ def convert_html_to_pdf(html_path: str, output_path: str | None = None) -> bool:
                 "--pdf-engine=xelatex",
             ]
             print(f"Converting '{full_input_path}' to '{full_output_path}' using pandoc...")
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
             if result.returncode == 0 and full_output_path.exists():
                 print(f"Successfully converted to '{full_output_path}'")
                 return True
             else:
-                print(f"pandoc failed: {result.stderr.strip() if result.stderr else 'unknown error'}")
+                stderr = result.stderr.decode('utf-8', errors='replace').strip()
+                print(f"pandoc failed: {stderr or 'unknown error'}")
                 return False
         except FileNotFoundError:
             print("Error: pandoc not found.")
@@ -122,12 +172,18 @@ def main():
             print(f"No .html files found in input folder: {input_dir}")
             print("Drop your HTML files into the 'input' folder and re-run.")
             return
-        any_failed = False
-        for html in html_files:
-            ok = convert_html_to_pdf(html.name, None)
-            if not ok:
-                any_failed = True
-        if any_failed:
+        # Each conversion is spent waiting on a wkhtmltopdf/pandoc subprocess, so
+        # threads are enough to run them side by side
+        workers = min(os.cpu_count() or 1, len(html_files))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # One wkhtmltopdf process per worker; anything it could not convert is
+            # retried per file below (with the pandoc fallback)
+            if len(html_files) > 1 and command_exists("wkhtmltopdf"):
+                groups = [html_files[i::workers] for i in range(workers)]
+                failed = executor.map(convert_html_batch, groups)
+                html_files = sorted(html for group in failed for html in group)
+            results = list(executor.map(convert_html_to_pdf, [str(html) for html in html_files]))
+        if not all(results):
             sys.exit(1)
         return
 
@@ -7,6 +7,7 @@ For each .ipynb in input/ (or a file passed as an argument), shells out to
 import os
 import sys
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
@@ -65,13 +66,15 @@ def convert_notebook_to_pdf(notebook_path: str, output_path: str | None = None)
         ]
         
         print(f"Converting '{full_input_path}' to '{full_output_path}'...")
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        # nbconvert logs to stderr even on success, so it stays bytes and is only
+        # decoded if the conversion fails
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
         
         if result.returncode == 0:
             print(f"Successfully converted to '{full_output_path}'")
             return True
         else:
-            print(f"Conversion failed: {result.stderr}")
+            print(f"Conversion failed: {result.stderr.decode('utf-8', errors='replace')}")
             return False
             
     except FileNotFoundError:
@@ -82,6 +85,48 @@ def convert_notebook_to_pdf(notebook_path: str, output_path: str | None = None)
         return False
 
 
+def convert_notebook_batch(notebooks: list[Path]) -> list[Path]:
+    """
+    Convert several notebooks with a single `jupyter nbconvert` run, so Python,
+    Jupyter and the exporter start once for the batch instead of once per notebook.
+
+    Args:
+        notebooks (list[Path]): Paths of the .ipynb files to convert
+
+    Returns:
+        list[Path]: The notebooks that did not produce a PDF, for the caller to retry
+    """
+    output_dir = Path(__file__).resolve().parent / "output"
+    output_dir.mkdir(exist_ok=True)
+
+    jobs = {nb: output_dir / f"{nb.stem}.pdf" for nb in notebooks}
+    # Clear stale PDFs so a notebook that fails this time isn't mistaken for converted
+    for pdf in jobs.values():
+        pdf.unlink(missing_ok=True)
+
+    cmd = ["jupyter", "nbconvert", "--to", "pdf", "--output-dir", str(output_dir)]
+    cmd += [str(nb) for nb in notebooks]
+    print(f"Converting {len(notebooks)} notebook(s) in one nbconvert run...")
+    try:
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    except FileNotFoundError:
+        print("Error: jupyter nbconvert not found. Make sure Jupyter is installed.")
+        return list(notebooks)
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return list(notebooks)
+
+    failed = []
+    for nb, pdf in jobs.items():
+        if pdf.exists():
+            print(f"Successfully converted '{nb}' to '{pdf}'")
+        else:
+            failed.append(nb)
+    if failed and result.returncode != 0:
+        print(f"Batch conversion failed: {result.stderr.decode('utf-8', errors='replace')}")
+    return failed
+
+
 def main():
     """Main function to handle command line usage"""
     if len(sys.argv) < 2:
@@ -95,12 +140,18 @@ def main():
             print("Example: python ipynb_pdf.py my_notebook.ipynb")
             print("Example: python ipynb_pdf.py my_notebook.ipynb output.pdf")
             return
-        any_failed = False
-        for nb_path in notebooks:
-            ok = convert_notebook_to_pdf(nb_path.name, None)
-            if not ok:
-                any_failed = True
-        if any_failed:
+        # Each conversion is spent waiting on the nbconvert/xelatex subprocess, so
+        # threads are enough to run them side by side
+        workers = min(os.cpu_count() or 1, len(notebooks))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # One nbconvert run per worker; anything it could not convert is
+            # retried on its own below
+            if len(notebooks) > 1:
+                groups = [notebooks[i::workers] for i in range(workers)]
+                failed = executor.map(convert_notebook_batch, groups)
+                notebooks = sorted(nb for group in failed for nb in group)
+            results = list(executor.map(convert_notebook_to_pdf, [nb.name for nb in notebooks]))
+        if not all(results):
             sys.exit(1)
         return
     else:
@@ -1,15 +1,30 @@
 """Convert JPG/JPEG images to plain text via OCR.
 
-For each image in input/, converts it to RGB, runs Tesseract OCR (through a
-temporary PNG), and writes the extracted text to output/.
+For each image in input/, runs Tesseract OCR on it (converting to RGB first if
+needed) and writes the extracted text to output/.
 """
 
 import os
-import glob
+import math
 import pytesseract
 import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from PIL import Image
 
+# libgomp reads OMP_THREAD_LIMIT once, when tesserocr loads it, and forked pool
+# workers inherit the library already loaded, so limit_tesseract_threads() would
+# be too late for in-process OCR. Set it before the import instead; the pool runs
+# one single-threaded Tesseract per core.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+try:
+    from tesserocr import PyTessBaseAPI, PSM
+    HAS_TESSEROCR = True
+except ImportError:
+    HAS_TESSEROCR = False
+
 # Dynamically find tesseract executable
 tesseract_path = shutil.which('tesseract')
 if tesseract_path:
@@ -24,6 +39,177 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 input_folder = os.path.join(script_dir, 'input')
 output_folder = os.path.join(script_dir, 'output')
 
+# This process's tesserocr handle (False once it's known to be unusable), set by
+# tess_api() on first use
+_tess_api = None
+
+# Most images handed to one Tesseract run
+BATCH_SIZE = 200
+
+
+def limit_tesseract_threads() -> None:
+    """Keep each Tesseract run to one thread; the process pool supplies the parallelism."""
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def tess_api():
+    """This process's tesserocr handle, or None to use the tesseract CLI instead.
+
+    Opened on first use, so the language model is loaded once per process rather
+    than once per image. Falls back to the CLI if tesserocr isn't installed or
+    can't find its language data.
+    """
+    global _tess_api
+    if _tess_api is None:
+        _tess_api = False
+        if HAS_TESSEROCR:
+            try:
+                _tess_api = PyTessBaseAPI(lang='eng', psm=PSM.SINGLE_BLOCK)
+            except RuntimeError:
+                pass
+    return _tess_api or None
+
+
+def ocr(source) -> str:
+    """OCR an image file path or PIL image (--oem 3 --psm 6, English).
+
+    Runs Tesseract in-process through tesserocr when it's available, and the
+    tesseract CLI through pytesseract otherwise.
+    """
+    api = tess_api()
+    if api is None:
+        return pytesseract.image_to_string(source, config=r'--oem 3 --psm 6', lang='eng')
+    if isinstance(source, str):
+        api.SetImageFile(source)
+    else:
+        api.SetImage(source)
+    return api.GetUTF8Text()
+
+
+def convert_one(jpg_file: str, output_folder: str) -> tuple[str, str | None, str | None]:
+    """OCR one image into a .txt file in output_folder.
+
+    Runs in a worker process, so the output folder is passed in (the worker wouldn't
+    see the module globals the server redirects) and the outcome is returned for
+    the caller to report rather than printed.
+
+    Returns:
+        (input path, text filename or None, error message or None)
+    """
+    try:
+        # Get filename without extension
+        filename = os.path.splitext(os.path.basename(jpg_file))[0]
+        txt_file = os.path.join(output_folder, f"{filename}.txt")
+        
+        # Open image and perform OCR
+        with Image.open(jpg_file) as img:
+            # Tesseract reads an RGB JPEG itself, so it gets the file as is. Anything
+            # else is converted to RGB first.
+            if img.mode == 'RGB' and img.format == 'JPEG':
+                source = jpg_file
+            else:
+                source = img.convert('RGB')
+            
+            # Extract text with better settings for accuracy
+            text = ocr(source)
+            
+            # Clean up extra whitespace
+            text = text.strip()
+            
+            # Save as text file
+            with open(txt_file, 'w', encoding='utf-8') as f:
+                f.write(text)
+        return jpg_file, f"{filename}.txt", None
+
+    except Exception as e:
+        return jpg_file, None, str(e)
+
+
+def convert_batch(jpg_files: list[str], output_folder: str
+                  ) -> list[tuple[str, str | None, str | None]]:
+    """OCR several images into .txt files in output_folder with one Tesseract run.
+
+    Tesseract takes a file listing the images and loads its language model once for
+    all of them, writing each page's text followed by a form feed. RGB JPEGs are
+    read by Tesseract directly; any other image, or the whole batch if Tesseract
+    fails or returns the wrong number of pages, goes through convert_one instead.
+    With tesserocr the model is already loaded in-process, so every image simply
+    goes through convert_one.
+
+    Returns:
+        One (input path, text filename or None, error message or None) per image, in
+        the order given
+    """
+    direct = []
+    for jpg_file in jpg_files:
+        try:
+            with Image.open(jpg_file) as img:
+                if img.mode == 'RGB' and img.format == 'JPEG':
+                    direct.append(jpg_file)
+        except Exception:
+            pass
+
+    results = {}
+    if len(direct) > 1 and tess_api() is None:
+        with tempfile.TemporaryDirectory() as tmp:
+            list_file = os.path.join(tmp, 'images.txt')
+            with open(list_file, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(direct) + '\n')
+            out_base = os.path.join(tmp, 'out')
+            cmd = [pytesseract.pytesseract.tesseract_cmd, list_file, out_base,
+                   '--oem', '3', '--psm', '6', '-l', 'eng']
+            try:
+                ok = subprocess.run(cmd, capture_output=True).returncode == 0
+                with open(out_base + '.txt', encoding='utf-8') as f:
+                    pages = f.read().split('\f')[:-1]
+            except OSError:
+                ok, pages = False, []
+
+        if ok and len(pages) == len(direct):
+            for jpg_file, text in zip(direct, pages):
+                filename = os.path.splitext(os.path.basename(jpg_file))[0]
+                try:
+                    with open(os.path.join(output_folder, f"{filename}.txt"), 'w',
+                              encoding='utf-8') as f:
+                        f.write(text.strip())
+                    results[jpg_file] = (jpg_file, f"{filename}.txt", None)
+                except Exception as e:
+                    results[jpg_file] = (jpg_file, None, str(e))
+
+    return [results.get(jpg_file) or convert_one(jpg_file, output_folder)
+            for jpg_file in jpg_files]
+
+
+def scan_input(folder: str) -> tuple[list[str], list[str]]:
+    """List the JPG and text files in folder with a single directory pass.
+
+    Extensions are matched case-insensitively and hidden files are skipped.
+
+    Returns:
+        (JPG/JPEG paths, .txt paths)
+    """
+    jpgs, others = [], []
+    buckets = {'.jpg': jpgs, '.jpeg': jpgs, '.txt': others}
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.name.startswith('.') or not entry.is_file():
+                    continue
+                bucket = buckets.get(os.path.splitext(entry.name)[1].lower())
+                if bucket is not None:
+                    bucket.append(entry.path)
+    except FileNotFoundError:
+        pass
+    return jpgs, others
+
+
+def is_up_to_date(jpg_file: str, out_file: str) -> bool:
+    """True if out_file exists and is at least as new as jpg_file, make-style."""
+    try:
+        return os.path.getmtime(out_file) >= os.path.getmtime(jpg_file)
+    except OSError:
+        return False
+
 
 def convert_jpg_to_ocr() -> str:
     """Convert all JPG/JPEG files in the input folder to text files using OCR.
@@ -37,57 +223,56 @@ def convert_jpg_to_ocr() -> str:
         os.makedirs(output_folder)
 
     # Find all JPG/JPEG files
-    jpg_files = glob.glob(os.path.join(input_folder, '*.jpg')) + \
-                glob.glob(os.path.join(input_folder, '*.jpeg'))
+    jpg_files, txt_present = scan_input(input_folder)
 
     if not jpg_files:
         # If there are only text files present, notify the user those are already in target format
-        txt_present = glob.glob(os.path.join(input_folder, '*.txt'))
         if txt_present:
             return "That file is already in text format"
         return "No JPG/JPEG files found in input folder"
 
     print(f"Found {len(jpg_files)} JPG/JPEG files to convert")
 
+    # Leave images whose output from an earlier run is still newer than them
+    pending = []
+    skipped = 0
+    for jpg_file in jpg_files:
+        filename = os.path.splitext(os.path.basename(jpg_file))[0]
+        if is_up_to_date(jpg_file, os.path.join(output_folder, f"{filename}.txt")):
+            print(f"Skip (up-to-date): {os.path.basename(jpg_file)}")
+            skipped += 1
+        else:
+            pending.append(jpg_file)
+    if not pending:
+        return f"All {skipped} file(s) already up to date in output/"
+    jpg_files = pending
+
+    # OCR is CPU-bound Tesseract work, so batches of images are OCR'd in separate
+    # processes, one single-threaded Tesseract per core, each loading its model
+    # once per batch
+    if len(jpg_files) > 1:
+        workers = min(os.cpu_count() or 1, len(jpg_files))
+        size = min(BATCH_SIZE, math.ceil(len(jpg_files) / workers))
+        batches = [jpg_files[i:i + size] for i in range(0, len(jpg_files), size)]
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=limit_tesseract_threads) as executor:
+            results = [result
+                       for batch in executor.map(convert_batch, batches,
+                                                 [output_folder] * len(batches))
+                       for result in batch]
+    else:
+        results = [convert_one(jpg_files[0], output_folder)]
+
     converted = []
     errors = []
 
-    for jpg_file in jpg_files:
-        try:
-            # Get filename without extension
-            filename = os.path.splitext(os.path.basename(jpg_file))[0]
-            txt_file = os.path.join(output_folder, f"{filename}.txt")
-            
-            # Open image and perform OCR
-            with Image.open(jpg_file) as img:
-                # Convert to RGB if needed
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                # Save as a temporary PNG for tesseract compatibility
-                temp_png = os.path.join(output_folder, f"{filename}_temp.png")
-                img.save(temp_png, 'PNG')
-                
-                # Use pytesseract to extract text with better settings for accuracy
-                custom_config = r'--oem 3 --psm 6'
-                text = pytesseract.image_to_string(temp_png, config=custom_config, lang='eng')
-                
-                # Clean up temporary PNG
-                os.remove(temp_png)
-                
-                # Clean up extra whitespace
-                text = text.strip()
-                
-                # Save as text file
-                with open(txt_file, 'w', encoding='utf-8') as f:
-                    f.write(text)
-                
-                print(f"Converted: {os.path.basename(jpg_file)} -> {filename}.txt")
-                converted.append(f"{filename}.txt")
-
-        except Exception as e:
-            print(f"Error converting {jpg_file}: {str(e)}")
-            errors.append(f"{os.path.basename(jpg_file)}: {e}")
+    for jpg_file, txt_name, error in results:
+        if error is None:
+            print(f"Converted: {os.path.basename(jpg_file)} -> {txt_name}")
+            converted.append(txt_name)
+        else:
+            print(f"Error converting {jpg_file}: {error}")
+            errors.append(f"{os.path.basename(jpg_file)}: {error}")
 
     if not converted:
         return f"No files converted. {len(errors)} failed: {'; '.join(errors)}"
@@ -95,6 +280,8 @@ def convert_jpg_to_ocr() -> str:
     summary = f"Converted {len(converted)} file(s) to output/: {', '.join(converted)}"
     if errors:
         summary += f". {len(errors)} failed: {'; '.join(errors)}"
+    if skipped:
+        summary += f". Skipped {skipped} up-to-date file(s)"
     return summary
 
 
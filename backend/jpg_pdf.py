@@ -1,11 +1,19 @@
 """Convert JPG/JPEG images to PDF.
 
-For each image in input/, opens it with Pillow, converts to RGB, and saves it as a
-single-page PDF in output/.
+For each image in input/, writes a single-page PDF to output/. A plain RGB or
+greyscale JPEG is embedded as is; anything else is converted to RGB with Pillow
+first. With --combined, all images go into one multi-page output/combined.pdf
+instead.
+
+Usage:
+    python jpg_pdf.py             # one PDF per image
+    python jpg_pdf.py --combined  # one PDF with a page per image
 """
 
+import argparse
 import os
-import glob
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 
 # Get the directory where this script is located
@@ -15,13 +23,188 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 input_folder = os.path.join(script_dir, 'input')
 output_folder = os.path.join(script_dir, 'output')
 
+# PDF colour spaces for the JPEG modes that can be embedded as they are
+JPEG_COLORSPACES = {'RGB': b'/DeviceRGB', 'L': b'/DeviceGray'}
+
+
+def scan_input(folder: str) -> tuple[list[str], list[str]]:
+    """List the JPG and PDF files in folder with a single directory pass.
+
+    Extensions are matched case-insensitively and hidden files are skipped.
+
+    Returns:
+        (JPG/JPEG paths, PDF paths)
+    """
+    jpgs, pdfs = [], []
+    buckets = {'.jpg': jpgs, '.jpeg': jpgs, '.pdf': pdfs}
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.name.startswith('.') or not entry.is_file():
+                    continue
+                bucket = buckets.get(os.path.splitext(entry.name)[1].lower())
+                if bucket is not None:
+                    bucket.append(entry.path)
+    except FileNotFoundError:
+        pass
+    return jpgs, pdfs
+
+
+def write_jpeg_pdf(pages: list[tuple[str, tuple[int, int], bytes]], pdf_file: str,
+                   resolution: float = 100.0) -> None:
+    """Write a PDF with a page per JPEG file, embedding each file's bytes unchanged.
+
+    PDF readers decode JPEG data themselves (/DCTDecode), so the images are neither
+    decoded nor re-compressed, and keep the original files' quality. Pages are
+    sized like Pillow's PDF output at the same resolution, and the files are read
+    one at a time as they are written.
+
+    Args:
+        pages: (JPEG path, (width, height), PDF colour space) for each page.
+    """
+    # Objects 1 and 2 are the catalog and page tree; each page then takes three
+    # objects: the page, its image and its content stream
+    kids = b' '.join(b'%d 0 R' % (3 + 3 * i) for i in range(len(pages)))
+    offsets = []
+
+    with open(pdf_file, 'wb') as f:
+        def write_object(obj: bytes, *stream: bytes) -> None:
+            offsets.append(f.tell())
+            f.write(b'%d 0 obj\n' % len(offsets))
+            f.write(obj)
+            if stream:
+                f.write(b'\nstream\n')
+                f.writelines(stream)
+                f.write(b'\nendstream')
+            f.write(b'\nendobj\n')
+
+        f.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        write_object(b'<< /Type /Catalog /Pages 2 0 R >>')
+        write_object(b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(pages)))
+        for jpg_file, (width, height), colorspace in pages:
+            page = len(offsets) + 1
+            page_w, page_h = width * 72 / resolution, height * 72 / resolution
+            content = b'q %g 0 0 %g 0 0 cm /Im0 Do Q' % (page_w, page_h)
+            with open(jpg_file, 'rb') as img:
+                data = img.read()
+            write_object(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %g %g] '
+                         b'/Resources << /XObject << /Im0 %d 0 R >> >> /Contents %d 0 R >>'
+                         % (page_w, page_h, page + 1, page + 2))
+            write_object(b'<< /Type /XObject /Subtype /Image /Width %d /Height %d '
+                         b'/ColorSpace %s /BitsPerComponent 8 /Filter /DCTDecode /Length %d >>'
+                         % (width, height, colorspace, len(data)), data)
+            write_object(b'<< /Length %d >>' % len(content), content)
+
+        xref = f.tell()
+        f.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(offsets) + 1))
+        f.writelines(b'%010d 00000 n \n' % o for o in offsets)
+        f.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+                % (len(offsets) + 1, xref))
+
+
+def jpeg_page(jpg_file: str) -> tuple[str, tuple[int, int], bytes] | None:
+    """The write_jpeg_pdf page for jpg_file, or None if it can't be embedded as is.
+
+    Only the header is read. Plain RGB and greyscale JPEGs can go into the PDF
+    as they are; anything else (CMYK, or an image that isn't really a JPEG) has
+    to be re-encoded.
+    """
+    with Image.open(jpg_file) as img:
+        colorspace = JPEG_COLORSPACES.get(img.mode) if img.format == 'JPEG' else None
+        return (jpg_file, img.size, colorspace) if colorspace is not None else None
+
+
+def is_up_to_date(jpg_file: str, out_file: str) -> bool:
+    """True if out_file exists and is at least as new as jpg_file, make-style."""
+    try:
+        return os.path.getmtime(out_file) >= os.path.getmtime(jpg_file)
+    except OSError:
+        return False
+
+
+def convert_one(jpg_file: str) -> tuple[str, str | None, str | None]:
+    """Convert one image to a single-page PDF in the output folder.
+
+    Runs on a worker thread, so it returns the outcome for the caller to report
+    rather than printing it.
+
+    Returns:
+        (input path, PDF filename or None, error message or None)
+    """
+    try:
+        # Get filename without extension
+        filename = os.path.splitext(os.path.basename(jpg_file))[0]
+        pdf_file = os.path.join(output_folder, f"{filename}.pdf")
+
+        # Plain RGB and greyscale JPEGs go into the PDF as they are
+        page = jpeg_page(jpg_file)
+        if page is not None:
+            write_jpeg_pdf([page], pdf_file)
+            return jpg_file, f"{filename}.pdf", None
 
-def convert_jpg_to_pdf() -> str:
+        # Anything else is converted to RGB and re-encoded
+        with Image.open(jpg_file) as img:
+            # Have libjpeg decode straight to RGB (no-op for other formats)
+            img.draft('RGB', img.size)
+            # Convert to RGB if necessary (for PNG with transparency, etc.)
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+
+            # Save as PDF
+            img.save(pdf_file, "PDF", resolution=100.0)
+        return jpg_file, f"{filename}.pdf", None
+
+    except Exception as e:
+        return jpg_file, None, str(e)
+
+
+def open_pages(jpg_files: list[str]):
+    """Yield each image opened for a page of the combined PDF.
+
+    Images are opened lazily and only decoded when Pillow writes their page, so
+    the files are not all read up front.
+    """
+    for jpg_file in jpg_files:
+        img = Image.open(jpg_file)
+        img.draft('RGB', img.size)
+        yield img if img.mode == 'RGB' else img.convert('RGB')
+
+
+def convert_combined(jpg_files: list[str]) -> str:
+    """Write all images as the pages of a single output/combined.pdf, in name order.
+
+    Returns:
+        A summary of what was converted, suitable for showing to a caller.
+    """
+    jpg_files = sorted(jpg_files)
+    pdf_file = os.path.join(output_folder, "combined.pdf")
+    try:
+        # If every image can be embedded as is, nothing needs decoding at all
+        jpeg_pages = [jpeg_page(jpg_file) for jpg_file in jpg_files]
+        if None not in jpeg_pages:
+            write_jpeg_pdf(jpeg_pages, pdf_file)
+        else:
+            pages = open_pages(jpg_files)
+            first = next(pages)
+            first.save(pdf_file, "PDF", resolution=100.0, save_all=True, append_images=pages)
+    except Exception as e:
+        print(f"Error combining images into {pdf_file}: {e}")
+        return f"No files converted. Combining {len(jpg_files)} image(s) failed: {e}"
+
+    print(f"Combined {len(jpg_files)} image(s) -> combined.pdf")
+    return f"Combined {len(jpg_files)} image(s) into output/combined.pdf"
+
+
+def convert_jpg_to_pdf(combined: bool = False) -> str:
     """Convert all JPG files in the input folder to PDF files in the output folder.
 
     Note: the image is embedded at 100 DPI with no text layer, so converting the
     resulting PDF onward to Markdown gives poor OCR. Use jpg_md.py for that instead.
 
+    Args:
+        combined: Write every image as a page of one combined.pdf instead of one
+            PDF per image.
+
     Returns:
         A summary of what was converted, suitable for showing to a caller.
     """
@@ -31,41 +214,48 @@ def convert_jpg_to_pdf() -> str:
         os.makedirs(output_folder)
 
     # Find all JPG files
-    jpg_files = glob.glob(os.path.join(input_folder, '*.jpg')) + \
-                glob.glob(os.path.join(input_folder, '*.jpeg'))
+    jpg_files, pdf_present = scan_input(input_folder)
 
     if not jpg_files:
         # If there are only PDFs present, notify the user those are already in target format
-        pdf_present = glob.glob(os.path.join(input_folder, '*.pdf'))
         if pdf_present:
             return "That file is already in pdf format"
         return "No JPG files found in input folder"
 
     print(f"Found {len(jpg_files)} JPG files to convert")
 
+    if combined:
+        return convert_combined(jpg_files)
+
+    # Leave images whose output from an earlier run is still newer than them
+    pending = []
+    skipped = 0
+    for jpg_file in jpg_files:
+        filename = os.path.splitext(os.path.basename(jpg_file))[0]
+        if is_up_to_date(jpg_file, os.path.join(output_folder, f"{filename}.pdf")):
+            print(f"Skip (up-to-date): {os.path.basename(jpg_file)}")
+            skipped += 1
+        else:
+            pending.append(jpg_file)
+    if not pending:
+        return f"All {skipped} file(s) already up to date in output/"
+    jpg_files = pending
+
+    # Decoding (libjpeg) and the PDF's compression both run with the GIL released,
+    # so files are converted on a thread per core
+    with ThreadPoolExecutor(max_workers=min(os.cpu_count() or 1, len(jpg_files))) as executor:
+        results = list(executor.map(convert_one, jpg_files))
+
     converted = []
     errors = []
 
-    for jpg_file in jpg_files:
-        try:
-            # Get filename without extension
-            filename = os.path.splitext(os.path.basename(jpg_file))[0]
-            pdf_file = os.path.join(output_folder, f"{filename}.pdf")
-
-            # Open and convert image to PDF
-            with Image.open(jpg_file) as img:
-                # Convert to RGB if necessary (for PNG with transparency, etc.)
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-
-                # Save as PDF
-                img.save(pdf_file, "PDF", resolution=100.0)
-                print(f"Converted: {os.path.basename(jpg_file)} -> {filename}.pdf")
-                converted.append(f"{filename}.pdf")
-
-        except Exception as e:
-            print(f"Error converting {jpg_file}: {str(e)}")
-            errors.append(f"{os.path.basename(jpg_file)}: {e}")
+    for jpg_file, pdf_name, error in results:
+        if error is None:
+            print(f"Converted: {os.path.basename(jpg_file)} -> {pdf_name}")
+            converted.append(pdf_name)
+        else:
+            print(f"Error converting {jpg_file}: {error}")
+            errors.append(f"{os.path.basename(jpg_file)}: {error}")
 
     if not converted:
         return f"No files converted. {len(errors)} failed: {'; '.join(errors)}"
@@ -73,8 +263,27 @@ def convert_jpg_to_pdf() -> str:
     summary = f"Converted {len(converted)} file(s) to output/: {', '.join(converted)}"
     if errors:
         summary += f". {len(errors)} failed: {'; '.join(errors)}"
+    if skipped:
+        summary += f". Skipped {skipped} up-to-date file(s)"
     return summary
 
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert JPG/JPEG images to PDF.")
+    parser.add_argument(
+        "--combined", action="store_true",
+        help="Write all images into one multi-page combined.pdf (default: one PDF per image).",
+    )
+    args = parser.parse_args()
+
+    result = convert_jpg_to_pdf(combined=args.combined)
+    print(result)
+
+    # Non-zero exit when nothing came out, so shell callers can tell
+    if result.startswith(("Error:", "No ")):
+        sys.exit(1)
+
+
 if __name__ == "__main__":
-    print(convert_jpg_to_pdf())
+    main()
 
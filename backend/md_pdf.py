@@ -13,6 +13,7 @@ Preprocessing (mirrors the inverse of pdf_md.py):
       turn spanning header rows into centered captions, mbox negative numbers.
     - Wrap ASCII-art / graph diagrams in code fences so their spacing survives.
 Mermaid diagram blocks are rendered via mermaid-filter when it's installed.
+Pass --fast (or set FILECONV_FAST=1) for quicker renders that give larger PDFs.
 
 Robustness: the full-fidelity render is attempted first. If xelatex chokes on
 the input (e.g. an undefined LaTeX command like a mistyped \\gama), we fall back
@@ -20,14 +21,17 @@ to a safe render with math/raw-LaTeX disabled so you still get a PDF, and report
 the command that likely broke it.
 """
 
+import hashlib
 import os
 import re
 import sys
 import subprocess
 import tempfile
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
-from shutil import which
+from shutil import copyfile, which
 
 # Config: paths (absolute, based on this script's location so it runs anywhere)
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -107,6 +111,81 @@ BAR_VARIABLES = {
 # Character classes reused across the script regexes.
 _GREEK_CLASS = "α-ωΑ-Ωθε"
 _SCRIPT_BASE = r"A-Za-z0-9" + _GREEK_CLASS + r"\)\]"
+_SUPERSCRIPT_CLASS = "".join(re.escape(c) for c in SUPERSCRIPT_TO_LATEX)
+_SUBSCRIPT_CLASS = "".join(re.escape(c) for c in SUBSCRIPT_TO_LATEX)
+
+# Whole-document cleanup regexes for the shared (safe) preprocessing
+_CONTROL_CHARS_RE = re.compile(r"[\x00-\x08\x0e-\x1f]")
+_LIST_DASH_RE = re.compile(r"([^\n])\n(- )")
+_LIST_STAR_RE = re.compile(r"([^\n])\n(\* )")
+_LIST_NUMBER_RE = re.compile(r"([^\n])\n(\d+\. )")
+_BRACKET_MATH_RE = re.compile(r"\\\[([\s\S]*?)\\\]")
+_PAREN_MATH_RE = re.compile(r"\\\(([\s\S]*?)\\\)")
+
+# normalize_math_delimiters' whole-document regexes, compiled once. Each starts
+# with a literal ($ or \) so the scan can jump between candidates; a lookbehind
+# is checked after that literal instead of being tried at every position.
+_ESCAPED_DOLLAR_PAIR_RE = re.compile(r"\\\$((?:[^$])+?)\\\$")
+_ESCAPED_DOLLAR_COMMAND_RE = re.compile(r"\\\$(\s*\\[a-zA-Z])")
+_ESCAPED_DOLLAR_ASSIGN_RE = re.compile(r"\\\$(\s*[A-Za-z]\s*=\s*\\)")
+_ESCAPED_DOLLAR_CLOSE_RE = re.compile(r"\\(?<=[a-zA-Z0-9}]\\)\$")
+_DOLLAR_SPACE_COMMAND_RE = re.compile(r"\$(?<!\$\$) +(?=\\[a-zA-Z])")
+_DOLLAR_SPACE_VAR_RE = re.compile(r"\$(?<!\$\$) +(?=[A-Za-z][^$\n]*(?:=|\\))")
+
+# Regexes run per line by the ASCII-diagram detector, compiled once
+_DIAGRAM_ARROW_RE = re.compile(r"--+>|<--+")
+_STRUCTURAL_ONLY_RE = re.compile(r"[\s|^v\d]*")
+_DIGITS_AND_SPACES_RE = re.compile(r"[\d\s]+")
+_SPREAD_DIGITS_RE = re.compile(r"\d\s{3,}\d")
+
+# Regexes run per table row/cell, compiled once
+_TABLE_SEP_RE = re.compile(r"^\|\s*[-:]+\s*(\|\s*[-:]+\s*)*\|?\s*$")
+_NOT_SEP_CHAR_RE = re.compile(r"[^\-\:]")
+_CELL_MATH_OP_RE = re.compile(r"\$([^\$]+?)\$\s*([=+\-×÷≤≥≠≈±])\s*\$([^\$]+?)\$")
+# A $..$ math span (group 1, left alone) or a negative number outside one
+_CELL_MATH_OR_NEGATIVE_RE = re.compile(r"(\$[^$]+\$)|-\d+")
+
+# Regexes for convert_symbols, compiled once: unicode super/subscript runs, and
+# per symbol the pattern for it outside math (plus, for SYMBOL_TO_LATEX, right
+# after a math block)
+_SUPERSCRIPT_RE = re.compile(rf"(?<!\$)([{_SCRIPT_BASE}])((?:[{_SUPERSCRIPT_CLASS}])+)(?!\$)")
+_SUBSCRIPT_RE = re.compile(rf"(?<!\$)([{_SCRIPT_BASE}])((?:[{_SUBSCRIPT_CLASS}])+)(?!\$)")
+
+
+def _outside_math_re(sym):
+    """Pattern for sym not directly preceded or followed by a $.
+
+    The symbol comes first and the "no $ before it" check is a lookbehind after it,
+    so the regex engine can search for the literal symbol rather than trying a
+    leading lookbehind at every position.
+    """
+    escaped = re.escape(sym)
+    return re.compile(escaped + r"(?<!\$" + escaped + r")(?!\$)")
+
+
+_BAR_VARIABLE_RES = [(var, _outside_math_re(var), latex)
+                     for var, latex in BAR_VARIABLES.items()]
+_SYMBOL_RES = [(sym, cmd,
+                _outside_math_re(sym),
+                re.compile(r"(\$[^$]+\$)\s*" + re.escape(sym) + r"(?!\$)"))
+               for sym, cmd in SYMBOL_TO_LATEX.items()]
+_MATH_KEEP_RES = [(sym, _outside_math_re(sym)) for sym in UNICODE_MATH_KEEP]
+
+# convert_symbols' remaining regexes. The math ones also run once per math span.
+_CODE_BLOCK_RE = re.compile(r"```.*?```", re.S)
+_CODE_SPAN_RE = re.compile(r"`[^`\n]*`")
+_HORIZONTAL_RULE_RE = re.compile(r"^---\s*$", re.MULTILINE)
+_COMBINING_BAR_RE = re.compile(r"([a-zA-Z])̄")
+_DISPLAY_MATH_RE = re.compile(r"\$\$([^$]*(?:\\.[^$]*)*?)\$\$")
+_INLINE_MATH_RE = re.compile(r"(?<!\$)\$([^$]+?)\$(?!\$)")
+_ADJACENT_MATH_RE = re.compile(r"\$([^$]+)\$\s*([+\-=])\s*\$([^$]+)\$")
+_DIGIT_SUBSCRIPT_RE = re.compile(r"_(\d)([a-zA-Z])")
+_VARIABLE_SUBSCRIPT_RE = re.compile(rf"([A-Za-z{_GREEK_CLASS}]+)(?<!\\\\)_([a-zA-Z0-9]+)(?![|])")
+_PLACEHOLDER_RE = re.compile(r"\x00(\d+)\x00")
+
+# Parsing xelatex's error output
+_UNDEFINED_COMMAND_RE = re.compile(r"Undefined control sequence\.\s*\n\s*l\.\d+\s*(.*)")
+_LATEX_COMMAND_RE = re.compile(r"\\([A-Za-z]+)")
 
 # Config: LaTeX preamble injected into every render
 LATEX_HEADER = """\\usepackage{amsmath}
@@ -150,12 +229,21 @@ LATEX_HEADER = """\\usepackage{amsmath}
 \\AtEndEnvironment{table}{\\nopagebreak[4]}
 """
 
+# Path of the file LATEX_HEADER is written to, set by _header_path() on first use
+_header_file = None
+
 
 # Preprocessing: control chars + math delimiters + list spacing
 def clean_control_chars(md):
     """Turn vertical-tab/form-feed into newlines and strip other control chars."""
     md = md.replace("\x0b", "\n").replace("\x0c", "\n")
-    return re.sub(r"[\x00-\x08\x0e-\x1f]", "", md)
+    return _CONTROL_CHARS_RE.sub("", md)
+
+
+def _unescape_math_dollars(m):
+    """\\$..\\$ -> $..$ when the content is actually math (contains a backslash)."""
+    content = m.group(1)
+    return f"${content.strip()}$" if "\\" in content else m.group(0)
 
 
 def normalize_math_delimiters(md):
@@ -165,35 +253,36 @@ def normalize_math_delimiters(md):
     Pandoc's tex_math_dollars also requires the opening $ to be immediately
     followed by a non-space character, so leading spaces are trimmed.
     """
-    # \[..\] -> $$..$$ and \(..\) -> $..$  (match pairs, allow newlines)
-    md = re.sub(r"\\\[([\s\S]*?)\\\]", lambda m: f"$${m.group(1)}$$", md)
-    md = re.sub(r"\\\(([\s\S]*?)\\\)", lambda m: f"${m.group(1).strip()}$", md)
-
     # Em/en dashes can break LaTeX rendering
     md = md.replace("—", "-").replace("–", "-")
 
+    # Every delimiter below involves a $ or a backslash; prose has neither
+    if "$" not in md and "\\" not in md:
+        return md
+
+    # \[..\] -> $$..$$ and \(..\) -> $..$  (match pairs, allow newlines)
+    md = _BRACKET_MATH_RE.sub(lambda m: f"$${m.group(1)}$$", md)
+    md = _PAREN_MATH_RE.sub(lambda m: f"${m.group(1).strip()}$", md)
+
     # \$..\$ pairs -> $..$ when the content is actually math (contains a backslash)
-    def unescape_math_dollars(m):
-        content = m.group(1)
-        return f"${content.strip()}$" if "\\" in content else m.group(0)
-    md = re.sub(r"\\\$((?:[^$])+?)\\\$", unescape_math_dollars, md)
+    md = _ESCAPED_DOLLAR_PAIR_RE.sub(_unescape_math_dollars, md)
 
     # Lone \$ used as an opening delimiter with no closing pair
-    md = re.sub(r"\\\$(\s*\\[a-zA-Z])", r"$\1", md)         # \$ \command
-    md = re.sub(r"\\\$(\s*[A-Za-z]\s*=\s*\\)", r"$\1", md)   # \$ var = \...
-    md = re.sub(r"(?<=[a-zA-Z0-9}])\\\$", "$", md)           # trailing closing \$
+    md = _ESCAPED_DOLLAR_COMMAND_RE.sub(r"$\1", md)   # \$ \command
+    md = _ESCAPED_DOLLAR_ASSIGN_RE.sub(r"$\1", md)    # \$ var = \...
+    md = _ESCAPED_DOLLAR_CLOSE_RE.sub("$", md)        # trailing closing \$
 
     # Trim space right after an opening $ so math commands stay inside math mode
-    md = re.sub(r"(?<!\$)\$ +(?=\\[a-zA-Z])", "$", md)                 # $ \command
-    md = re.sub(r"(?<!\$)\$ +(?=[A-Za-z][^$\n]*(?:=|\\))", "$", md)     # $ var=
+    md = _DOLLAR_SPACE_COMMAND_RE.sub("$", md)        # $ \command
+    md = _DOLLAR_SPACE_VAR_RE.sub("$", md)            # $ var=
     return md
 
 
 def ensure_list_spacing(md):
     """Add a blank line before lists so pandoc reliably recognizes them."""
-    md = re.sub(r"([^\n])\n(- )", r"\1\n\n\2", md)
-    md = re.sub(r"([^\n])\n(\* )", r"\1\n\n\2", md)
-    md = re.sub(r"([^\n])\n(\d+\. )", r"\1\n\n\2", md)
+    md = _LIST_DASH_RE.sub(r"\1\n\n\2", md)
+    md = _LIST_STAR_RE.sub(r"\1\n\n\2", md)
+    md = _LIST_NUMBER_RE.sub(r"\1\n\n\2", md)
     return md
 
 
@@ -203,17 +292,17 @@ def _is_ascii_diagram_line(ln):
     s = ln.rstrip()
     if not s:
         return False
-    # Horizontal arrow patterns used in graph diagrams
-    if re.search(r"--+>|<--+", s):
+    # Horizontal arrow patterns used in graph diagrams (the substring checks rule
+    # out most prose lines without running the regex)
+    if ("->" in s or "<-" in s) and _DIAGRAM_ARROW_RE.search(s):
         return True
     # Lines composed entirely of structural characters (|, ^, v, digits, spaces)
     # e.g. "|        |         |"  or  "5        |         8"
-    structural_only = re.sub(r"[\s|^v\d]", "", s)
-    if structural_only == "" and ("|" in s or "^" in s):
+    if ("|" in s or "^" in s) and _STRUCTURAL_ONLY_RE.fullmatch(s):
         return True
     # Lines with only digits and spaces that use large gaps for positioning
     # e.g. "1        6         3" — numbers spread out as edge weights in a diagram
-    if re.match(r"^[\d\s]+$", s) and re.search(r"\d\s{3,}\d", s):
+    if _DIGITS_AND_SPACES_RE.fullmatch(s) and _SPREAD_DIGITS_RE.search(s):
         return True
     return False
 
@@ -221,6 +310,8 @@ def _is_ascii_diagram_line(ln):
 def wrap_ascii_diagrams(md):
     """Wrap contiguous ASCII-diagram blocks in code fences to preserve spacing."""
     lines = md.split("\n")
+    # Classify each line once; the block scan below looks at most lines more than once
+    is_diagram = [_is_ascii_diagram_line(line) for line in lines]
     wrapped_lines = []
     idx = 0
     in_fence = False
@@ -232,17 +323,17 @@ def wrap_ascii_diagrams(md):
             wrapped_lines.append(line)
             idx += 1
             continue
-        if not in_fence and _is_ascii_diagram_line(line):
+        if not in_fence and is_diagram[idx]:
             # Collect the contiguous diagram block, allowing single blank lines
             # between diagram lines (so the whole graph stays together)
             block_start = idx
             j = idx
             while j < len(lines):
-                if _is_ascii_diagram_line(lines[j]):
+                if is_diagram[j]:
                     j += 1
                 elif (not lines[j].strip()
                       and j + 1 < len(lines)
-                      and _is_ascii_diagram_line(lines[j + 1])):
+                      and is_diagram[j + 1]):
                     j += 1  # blank line bridging two diagram lines
                 else:
                     break
@@ -261,6 +352,9 @@ def wrap_ascii_diagrams(md):
 # Preprocessing: tables
 def _convert_paren_math_to_dollars(text):
     r"""Convert \(...\) to $...$ within a table cell, honoring nesting."""
+    if "\\(" not in text:
+        return text
+
     result = []
     i = 0
     while i < len(text):
@@ -269,30 +363,56 @@ def _convert_paren_math_to_dollars(text):
             result.append(text[i:])
             break
         result.append(text[i:start])
-        # Find matching \)
+        # Find matching \), jumping from one backslash to the next
         depth = 0
-        j = start + 2
-        while j < len(text):
-            if j < len(text) - 1 and text[j:j + 2] == "\\(":
+        j = text.find("\\", start + 2)
+        while j != -1 and j < len(text) - 1:
+            nxt = text[j + 1]
+            if nxt == "(":
                 depth += 1
                 j += 2
-            elif j < len(text) - 1 and text[j:j + 2] == "\\)":
+            elif nxt == ")":
                 if depth == 0:
                     math_inner = text[start + 2:j]
                     result.append(f"${math_inner}$")
                     i = j + 2
                     break
-                else:
-                    depth -= 1
-                    j += 2
+                depth -= 1
+                j += 2
             else:
                 j += 1
+            j = text.find("\\", j)
         else:
             result.append(text[start:])
             break
     return "".join(result)
 
 
+def _merge_math_pairs(text, pair_re):
+    """Merge "$a$ op $b$" pairs into "$a op b$" blocks until none are left.
+
+    Each pass merges one pair per chain, so "$a$ + $b$ + $c$" takes two. subn's
+    count tells when a pass changed nothing, without comparing the whole text.
+    """
+    while True:
+        text, merged = pair_re.subn(r"$\1 \2 \3$", text)
+        if not merged:
+            return text
+
+
+def _mbox_negative(m):
+    return m.group(0) if m.group(1) else f"\\mbox{{{m.group(0)}}}"
+
+
+def _protect_negatives_outside_math(cell):
+    """Wrap negative numbers outside $..$ math in \\mbox{} so they can't break.
+
+    One scan picks out math spans and negative numbers together, so a number
+    inside math is matched as part of its span and passed over.
+    """
+    return _CELL_MATH_OR_NEGATIVE_RE.sub(_mbox_negative, cell)
+
+
 def normalize_tables(md):
     """Normalize pipe-table spacing and guard tables against LaTeX breakage.
 
@@ -300,61 +420,65 @@ def normalize_tables(md):
     protection around tables, spanning header rows converted to centered
     captions, table-cell math combined, and negative numbers mbox-protected.
     """
+    # Without a pipe there are no tables, and every line would pass through as is
+    if "|" not in md:
+        return md
+
     lines = md.split("\n")
     cleaned_lines = []
 
-    prev_line_was_table = False
     in_table = False
     in_math_block = False   # inside a $$...$$ block
     in_code_block = False   # inside a ``` code fence
 
     for i, line in enumerate(lines):
+        # Outside a table, a line with no pipe, backtick or $ can't be a row or
+        # change state, so it passes straight through
+        if not in_table and "|" not in line and "`" not in line and "$" not in line:
+            cleaned_lines.append(line)
+            continue
+
         stripped = line.strip()
 
         # Code fences: content inside ``` must pass through untouched
         if stripped.startswith("```"):
             in_code_block = not in_code_block
             cleaned_lines.append(line)
-            prev_line_was_table = False
             continue
         if in_code_block:
             cleaned_lines.append(line)
-            prev_line_was_table = False
             continue
 
         # Math blocks: a lone $$ toggles state; skip table processing inside
         if stripped == "$$":
             in_math_block = not in_math_block
             cleaned_lines.append(line)
-            prev_line_was_table = False
             continue
         if in_math_block:
             cleaned_lines.append(line)
-            prev_line_was_table = False
             continue
 
         # Is this a table row?
         if stripped.startswith("|") and "|" in stripped[1:]:
             # Start of a new table: add page-break protection before it
-            if not in_table and not prev_line_was_table:
+            if not in_table:
                 cleaned_lines.append("")
                 cleaned_lines.append("\\nopagebreak[4]")
                 cleaned_lines.append("")
                 in_table = True
 
-            is_separator = bool(re.match(r"^\|\s*[-:]+\s*(\|\s*[-:]+\s*)*\|?\s*$", stripped))
+            is_separator = bool(_TABLE_SEP_RE.match(stripped))
 
             if is_separator:
                 # Normalize separator row spacing
                 parts = stripped.split("|")
                 cells = []
                 for part in parts[1:-1]:  # skip first/last empty parts
-                    sep_content = re.sub(r"[^\-\:]", "", part)  # keep only - and :
+                    sep_content = _NOT_SEP_CHAR_RE.sub("", part)  # keep only - and :
                     if not sep_content:
                         sep_content = "---"
                     cells.append(sep_content)
                 cleaned_lines.append("| " + " | ".join(cells) + " |")
-                prev_line_was_table = True
             else:
                 # Regular table row: normalize spacing, preserve cell content
                 parts = stripped.split("|")
@@ -366,24 +490,11 @@ def normalize_tables(md):
                     cell_content = _convert_paren_math_to_dollars(cell_content)
                     # Combine adjacent $...$ separated by a math operator into one block
                     # e.g. "$d_i$ = $y_i$ - $x_i$" -> "$d_i = y_i - x_i$"
-                    while True:
-                        combined = re.sub(
-                            r"\$([^\$]+?)\$\s*([=+\-×÷≤≥≠≈±])\s*\$([^\$]+?)\$",
-                            r"$\1 \2 \3$",
-                            cell_content,
-                        )
-                        if combined == cell_content:
-                            break
-                        cell_content = combined
+                    if "$" in cell_content:
+                        cell_content = _merge_math_pairs(cell_content, _CELL_MATH_OP_RE)
                     # Protect negative numbers from line breaks (outside math only)
-                    parts_list = re.split(r"(\$[^\$]+\$)", cell_content)
-                    protected_parts = []
-                    for p in parts_list:
-                        if p.startswith("$") and p.endswith("$"):
-                            protected_parts.append(p)  # math, keep as-is
-                        else:
-                            protected_parts.append(re.sub(r"(-\d+)", r"\\mbox{\1}", p))
-                    cell_content = "".join(protected_parts)
+                    if "-" in cell_content:
+                        cell_content = _protect_negatives_outside_math(cell_content)
                     cells.append(cell_content)
 
                 # Spanning header rows (fewer cells than the real table) break the
@@ -405,11 +516,9 @@ def normalize_tables(md):
                                 escaped_header = escaped_header.replace("_", "\\_").replace("~", "\\textasciitilde{}")
                                 cleaned_lines.append(f"\\begin{{center}}\\textbf{{{escaped_header}}}\\end{{center}}")
                                 cleaned_lines.append("")
-                            prev_line_was_table = False
                             continue
 
                 cleaned_lines.append("| " + " | ".join(cells) + " |")
-                prev_line_was_table = True
         else:
             # Left a table: close the page-break protection
             if in_table and not stripped.startswith("|"):
@@ -417,61 +526,97 @@ def normalize_tables(md):
                 cleaned_lines.append("")
                 in_table = False
             cleaned_lines.append(line)
-            prev_line_was_table = False
 
     return "\n".join(cleaned_lines)
 
 
 # Preprocessing: unicode math -> LaTeX (code spans/blocks protected)
-def _convert_scripts(md):
-    """Convert unicode super/subscript runs to LaTeX, e.g. x² -> $x^{2}$, xᵢ -> $x_{i}$."""
-    sup = "".join(re.escape(c) for c in SUPERSCRIPT_TO_LATEX)
-    sub = "".join(re.escape(c) for c in SUBSCRIPT_TO_LATEX)
+def _superscript_latex(m):
+    base = GREEK_TO_LATEX.get(m.group(1), m.group(1))
+    exp = "".join(SUPERSCRIPT_TO_LATEX[c] for c in m.group(2))
+    return f"${base}^{{{exp}}}$"
+
 
-    def sup_repl(m):
-        base = GREEK_TO_LATEX.get(m.group(1), m.group(1))
-        exp = "".join(SUPERSCRIPT_TO_LATEX[c] for c in m.group(2))
-        return f"${base}^{{{exp}}}$"
+def _subscript_latex(m):
+    base = GREEK_TO_LATEX.get(m.group(1), m.group(1))
+    idx = "".join(SUBSCRIPT_TO_LATEX[c] for c in m.group(2))
+    return f"${base}_{{{idx}}}$"
 
-    def sub_repl(m):
-        base = GREEK_TO_LATEX.get(m.group(1), m.group(1))
-        idx = "".join(SUBSCRIPT_TO_LATEX[c] for c in m.group(2))
-        return f"${base}_{{{idx}}}$"
 
-    md = re.sub(rf"(?<!\$)([{_SCRIPT_BASE}])((?:[{sup}])+)(?!\$)", sup_repl, md)
-    md = re.sub(rf"(?<!\$)([{_SCRIPT_BASE}])((?:[{sub}])+)(?!\$)", sub_repl, md)
+def _convert_scripts(md):
+    """Convert unicode super/subscript runs to LaTeX, e.g. x² -> $x^{2}$, xᵢ -> $x_{i}$."""
+    md = _SUPERSCRIPT_RE.sub(_superscript_latex, md)
+    md = _SUBSCRIPT_RE.sub(_subscript_latex, md)
     return md
 
 
+def _variable_subscript_latex(m):
+    base_var, subscript = m.group(1), m.group(2)
+    latex_base = "".join(GREEK_TO_LATEX.get(ch, ch) for ch in base_var)
+    if len(subscript) > 1:
+        return f"{latex_base}_{{{subscript}}}"
+    return f"{latex_base}_{subscript}"
+
+
 def _convert_underscores_in_math(math_content):
     """Turn variable_subscript patterns into proper LaTeX subscripts inside math."""
-    # k_1x would be misparsed as k_{1x}; make the grouping explicit first
-    math_content = re.sub(r"_(\d)([a-zA-Z])", r"_{\1}\2", math_content)
+    if "_" not in math_content:
+        return math_content
 
-    def replace_subscript(m):
-        base_var, subscript = m.group(1), m.group(2)
-        latex_base = "".join(GREEK_TO_LATEX.get(ch, ch) for ch in base_var)
-        if len(subscript) > 1:
-            return f"{latex_base}_{{{subscript}}}"
-        return f"{latex_base}_{subscript}"
+    # k_1x would be misparsed as k_{1x}; make the grouping explicit first
+    math_content = _DIGIT_SUBSCRIPT_RE.sub(r"_{\1}\2", math_content)
 
     # variable (letters/greek) + underscore + subscript (letters/numbers),
     # skipping escaped underscores and table separators
-    return re.sub(
-        rf"([A-Za-z{_GREEK_CLASS}]+)(?<!\\\\)_([a-zA-Z0-9]+)(?![|])",
-        replace_subscript,
-        math_content,
-    )
+    return _VARIABLE_SUBSCRIPT_RE.sub(_variable_subscript_latex, math_content)
 
 
 def _combine_adjacent_math(md):
     """Merge "$a$ op $b$" (op in + - =) into a single "$a op b$" block."""
-    while True:
-        combined = re.sub(r"\$([^$]+)\$\s*([+\-=])\s*\$([^$]+)\$", r"$\1 \2 \3$", md)
-        if combined == md:
-            break
-        md = combined
-    return md
+    return _merge_math_pairs(md, _ADJACENT_MATH_RE)
+
+
+def _display_math_subscripts(m):
+    return f"$${_convert_underscores_in_math(m.group(1))}$$"
+
+
+def _inline_math_subscripts(m):
+    return f"${_convert_underscores_in_math(m.group(1))}$"
+
+
+def _stash(protected, m):
+    """Swap a match for a placeholder, keeping its text in protected."""
+    protected.append(m.group(0))
+    return f"\x00{len(protected) - 1}\x00"
+
+
+def _unstash(protected, m):
+    text = protected[int(m.group(1))]
+    # An inline code span can hold the placeholder of a code block stashed before
+    # it; that is restored here too, so one pass over the document puts back all
+    if "\x00" in text:
+        text = _PLACEHOLDER_RE.sub(partial(_unstash, protected), text)
+    return text
+
+
+def _protect_code(md):
+    """Stash code blocks and inline code behind placeholders.
+
+    Returns:
+        (md with placeholders, the stashed code for _restore_code)
+    """
+    protected = []
+    stash = partial(_stash, protected)
+    md = _CODE_BLOCK_RE.sub(stash, md)
+    md = _CODE_SPAN_RE.sub(stash, md)
+    return md, protected
+
+
+def _restore_code(md, protected):
+    """Put back the code _protect_code stashed, in a single pass over md."""
+    if not protected:
+        return md
+    return _PLACEHOLDER_RE.sub(partial(_unstash, protected), md)
 
 
 def convert_symbols(md):
@@ -480,84 +625,109 @@ def convert_symbols(md):
     Code blocks and inline code are stashed first so identifiers/diagrams inside
     them are never rewritten, then restored at the end.
     """
-    protected = []
-
-    def stash(s):
-        protected.append(s)
-        return f"\x00{len(protected) - 1}\x00"
-
-    md = re.sub(r"```.*?```", lambda m: stash(m.group(0)), md, flags=re.S)
-    md = re.sub(r"`[^`\n]*`", lambda m: stash(m.group(0)), md)
+    md, protected = _protect_code(md)
 
     # Horizontal rules -> paragraph break (spacing)
-    md = re.sub(r"^---\s*$", r"\n\n", md, flags=re.MULTILINE)
+    md = _HORIZONTAL_RULE_RE.sub(r"\n\n", md)
+
+    # Every symbol handled below is non-ASCII, so for plain ASCII text only the
+    # passes over existing $..$ math can apply (and without a $, none do)
+    is_ascii = md.isascii()
 
-    # Barred variables: combining macron form, then precomposed characters
-    md = re.sub(r"([a-zA-Z])̄", r"$\\bar{\1}$", md)
-    for var, latex in BAR_VARIABLES.items():
-        md = re.sub(r"(?<!\$)" + re.escape(var) + r"(?!\$)", latex, md)
+    if not is_ascii:
+        # Barred variables: combining macron form, then precomposed characters
+        md = _COMBINING_BAR_RE.sub(r"$\\bar{\1}$", md)
+        for var, pattern, latex in _BAR_VARIABLE_RES:
+            if var in md:
+                md = pattern.sub(latex, md)
 
-    # Unicode super/subscripts -> LaTeX (θ₀ -> $\theta_{0}$, x² -> $x^{2}$)
-    md = _convert_scripts(md)
+        # Unicode super/subscripts -> LaTeX (θ₀ -> $\theta_{0}$, x² -> $x^{2}$)
+        md = _convert_scripts(md)
 
     # Underscore subscripts inside existing math blocks
-    md = re.sub(
-        r"\$\$([^$]*(?:\\.[^$]*)*?)\$\$",
-        lambda m: f"$${_convert_underscores_in_math(m.group(1))}$$",
-        md,
-    )
-    md = re.sub(
-        r"(?<!\$)\$([^$]+?)\$(?!\$)",
-        lambda m: f"${_convert_underscores_in_math(m.group(1))}$",
-        md,
-    )
-
-    # Greek + operators -> $\command$ (plain, and when butted against closing $)
-    for sym, cmd in SYMBOL_TO_LATEX.items():
-        md = re.sub(r"(?<!\$)" + re.escape(sym) + r"(?!\$)",
-                    lambda m, c=cmd: f"${c}$", md)
-        md = re.sub(r"(\$[^$]+\$)\s*" + re.escape(sym) + r"(?!\$)",
-                    lambda m, c=cmd: f"{m.group(1)} ${c}$", md)
-
-    # Merge adjacent math blocks created above
-    md = _combine_adjacent_math(md)
-
-    # Symbols that render best as unicode kept in math mode
-    for sym in UNICODE_MATH_KEEP:
-        md = re.sub(r"(?<!\$)" + re.escape(sym) + r"(?!\$)",
-                    lambda m, s=sym: f"${s}$", md)
+    if "$" in md:
+        md = _DISPLAY_MATH_RE.sub(_display_math_subscripts, md)
+        md = _INLINE_MATH_RE.sub(_inline_math_subscripts, md)
+
+    if not is_ascii:
+        # Greek + operators -> $\command$ (plain, and when butted against closing $).
+        # Most documents use few of these, so absent symbols skip both scans.
+        for sym, cmd, plain, after_math in _SYMBOL_RES:
+            if sym not in md:
+                continue
+            md = plain.sub(lambda m, c=cmd: f"${c}$", md)
+            # Only occurrences next to a $ survive the plain pass; usually there are none
+            if sym in md:
+                md = after_math.sub(lambda m, c=cmd: f"{m.group(1)} ${c}$", md)
+
+    if "$" in md:
+        # Merge adjacent math blocks created above
+        md = _combine_adjacent_math(md)
+
+    if not is_ascii:
+        # Symbols that render best as unicode kept in math mode
+        for sym, pattern in _MATH_KEEP_RES:
+            if sym in md:
+                md = pattern.sub(lambda m, s=sym: f"${s}$", md)
 
     # Trim whitespace inside $...$ (tex_math_dollars wants no padding)
-    md = re.sub(r"(?<!\$)\$([^$]+?)\$(?!\$)",
-                lambda m: f"${m.group(1).strip()}$", md)
+    if "$" in md:
+        md = _INLINE_MATH_RE.sub(lambda m: f"${m.group(1).strip()}$", md)
 
-    # Restore protected code (loop in case a span nested another placeholder)
-    for _ in range(5):
-        if "\x00" not in md:
-            break
-        md = re.sub(r"\x00(\d+)\x00", lambda m: protected[int(m.group(1))], md)
-    return md
+    # Restore protected code
+    return _restore_code(md, protected)
 
 
 # Rendering
+# Cached so a batch run walks $PATH once per tool instead of once per file; the
+# absolute path is passed to subprocess so the child doesn't search $PATH either.
+@lru_cache(maxsize=4)
+def find_tool(cmd):
+    """Absolute path of cmd on $PATH, or None if it isn't installed."""
+    return which(cmd)
+
+
+def fast_mode():
+    """True when FILECONV_FAST is set (or --fast was passed).
+
+    Fast mode trades file size for speed: xelatex's PDF driver skips compressing
+    streams and images (-z0), and LaTeX runs in batch mode.
+    """
+    return bool(os.environ.get("FILECONV_FAST"))
+
+
 def _extract_bad_command(err):
     """Pull the offending \\command out of an xelatex 'Undefined control sequence'."""
-    m = re.search(r"Undefined control sequence\.\s*\n\s*l\.\d+\s*(.*)", err)
+    m = _UNDEFINED_COMMAND_RE.search(err)
     if not m:
         return None
-    cmds = re.findall(r"\\([A-Za-z]+)", m.group(1))
+    cmds = _LATEX_COMMAND_RE.findall(m.group(1))
     return f"\\{cmds[-1]}" if cmds else None
 
 
-def _pandoc_once(md_text, output_path, from_fmt, header_path, mermaid_filter):
-    """Run pandoc once on md_text. Returns (ok, error_message)."""
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".md", delete=False,
-                                     encoding="utf-8") as temp_md:
-        temp_md.write(md_text)
-        temp_md_path = temp_md.name
+def _header_path():
+    """Path of a file holding LATEX_HEADER, written on first use and then reused.
+
+    The name carries a hash of the header, so an edited header gets a fresh file.
+    """
+    global _header_file
+    if _header_file is None or not os.path.exists(_header_file):
+        digest = hashlib.sha1(LATEX_HEADER.encode("utf-8")).hexdigest()[:12]
+        path = os.path.join(tempfile.gettempdir(), f"md_pdf_header_{digest}.tex")
+        if not os.path.exists(path):
+            # Write then rename, so a concurrent conversion never reads a partial file
+            fd, tmp = tempfile.mkstemp(suffix=".tex", dir=os.path.dirname(path))
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(LATEX_HEADER)
+            os.replace(tmp, path)
+        _header_file = path
+    return _header_file
+
 
+def _pandoc_once(md_text, output_path, from_fmt, header_path, mermaid_filter):
+    """Run pandoc once on md_text, fed on stdin. Returns (ok, error_message)."""
     cmd = [
-        "pandoc", temp_md_path,
+        find_tool("pandoc") or "pandoc",
         "-o", str(output_path),
         "--pdf-engine=xelatex",
         "--standalone",
@@ -565,16 +735,17 @@ def _pandoc_once(md_text, output_path, from_fmt, header_path, mermaid_filter):
         f"--from={from_fmt}",
         "--to=pdf",
     ]
+    if fast_mode():
+        cmd += ["--pdf-engine-opt=-output-driver=xdvipdfmx -z0",
+                "--pdf-engine-opt=-interaction=batchmode"]
     if mermaid_filter:
         cmd += ["--filter", mermaid_filter]
 
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        # Output is kept as bytes and only decoded if the render fails, since a
+        # successful xelatex run can still write a long log
+        result = subprocess.run(cmd, input=md_text.encode("utf-8"), capture_output=True)
     finally:
-        try:
-            os.unlink(temp_md_path)
-        except OSError:
-            pass
         # mermaid-filter writes a .err file in the cwd; clean it up
         err_file = Path("mermaid-filter.err")
         if err_file.exists():
@@ -585,50 +756,139 @@ def _pandoc_once(md_text, output_path, from_fmt, header_path, mermaid_filter):
 
     if result.returncode == 0 and output_path.exists():
         return True, ""
-    error_msg = result.stderr.strip() if result.stderr else "unknown error"
-    if result.stdout:
-        error_msg += f"\nstdout: {result.stdout.strip()}"
+    stderr = result.stderr.decode("utf-8", errors="replace").strip()
+    stdout = result.stdout.decode("utf-8", errors="replace").strip()
+    error_msg = stderr or "unknown error"
+    if stdout:
+        error_msg += f"\nstdout: {stdout}"
     return False, error_msg
 
 
 def run_pandoc(rich_md, safe_md, output_path):
     """Render with full fidelity, falling back to a safe render if xelatex fails."""
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".tex", delete=False,
-                                     encoding="utf-8") as header_file:
-        header_file.write(LATEX_HEADER)
-        header_path = header_file.name
+    header_path = _header_path()
+    mermaid_filter = find_tool("mermaid-filter")
+
+    ok, err = _pandoc_once(rich_md, output_path, PANDOC_FROM, header_path, mermaid_filter)
+    if ok:
+        _record_build(output_path, _render_mode())
+        print(f"Successfully converted to '{output_path}'")
+        return True
+
+    # Full render failed: report the likely culprit and try the safe render.
+    bad = _extract_bad_command(err)
+    if bad:
+        print(f"  full render failed on undefined LaTeX command '{bad}' "
+              f"(check your markdown); retrying in safe mode")
+    else:
+        print("  full render failed; retrying in safe mode")
+
+    ok, err2 = _pandoc_once(safe_md, output_path, PANDOC_FROM_SAFE, header_path, mermaid_filter)
+    if ok:
+        # Recorded as "safe", which never counts as up to date, so the next run
+        # tries the full render again
+        _record_build(output_path, "safe")
+        print(f"  produced a PDF in safe mode (math shown as text) -> '{output_path}'")
+        return True
+
+    print(f"pandoc failed: {err2}")
+    return False
+
+
+# Orchestration
+# How each output PDF was rendered, for the make-style skip. Kept next to this script
+# rather than beside the PDFs, so the records never ship with the converted results.
+STAMP_DIR = os.path.join(script_dir, ".cache", "md_pdf")
+
+# Most build records kept; the least recently written are removed past this
+STAMP_MAX_ENTRIES = 500
 
-    mermaid_filter = which("mermaid-filter")
 
+def _render_mode():
+    """How a full render made now is built: "fast" (uncompressed) or "normal"."""
+    return "fast" if fast_mode() else "normal"
+
+
+def _stamp_path(output_path):
+    digest = hashlib.sha1(os.fsencode(os.path.abspath(output_path))).hexdigest()
+    return os.path.join(STAMP_DIR, f"{digest}.txt")
+
+
+def _record_build(output_path, mode):
+    """Note how output_path was just rendered. Failures only cost a future rebuild."""
     try:
-        ok, err = _pandoc_once(rich_md, output_path, PANDOC_FROM, header_path, mermaid_filter)
-        if ok:
-            print(f"Successfully converted to '{output_path}'")
-            return True
-
-        # Full render failed: report the likely culprit and try the safe render.
-        bad = _extract_bad_command(err)
-        if bad:
-            print(f"  full render failed on undefined LaTeX command '{bad}' "
-                  f"(check your markdown); retrying in safe mode")
-        else:
-            print("  full render failed; retrying in safe mode")
+        st = os.stat(output_path)
+        os.makedirs(STAMP_DIR, exist_ok=True)
+        with open(_stamp_path(output_path), "w", encoding="utf-8") as f:
+            f.write(f"{mode} {st.st_mtime_ns} {st.st_size}\n")
+    except OSError:
+        return
+    _prune_stamps()
 
-        ok, err2 = _pandoc_once(safe_md, output_path, PANDOC_FROM_SAFE, header_path, mermaid_filter)
-        if ok:
-            print(f"  produced a PDF in safe mode (math shown as text) -> '{output_path}'")
-            return True
 
-        print(f"pandoc failed: {err2}")
-        return False
-    finally:
+def _prune_stamps(max_entries=STAMP_MAX_ENTRIES):
+    """Remove the oldest build records beyond max_entries."""
+    entries = []
+    try:
+        with os.scandir(STAMP_DIR) as it:
+            for entry in it:
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    pass
+    except OSError:
+        return
+    if len(entries) <= max_entries:
+        return
+    entries.sort()
+    for _, path in entries[:len(entries) - max_entries]:
         try:
-            os.unlink(header_path)
+            os.unlink(path)
         except OSError:
             pass
 
 
-# Orchestration
+def _built_as(output_path):
+    """Mode _record_build noted for output_path ("normal", "fast" or "safe").
+
+    None if there's no record, or the PDF has been replaced since it was made.
+    """
+    try:
+        with open(_stamp_path(output_path), encoding="utf-8") as f:
+            mode, mtime_ns, size = f.read().split()
+        st = os.stat(output_path)
+        if (int(mtime_ns), int(size)) != (st.st_mtime_ns, st.st_size):
+            return None
+    except (OSError, ValueError):
+        return None
+    return mode
+
+
+def _is_up_to_date(output_path, *sources):
+    """True if output_path exists and is at least as new as every source."""
+    try:
+        built = output_path.stat().st_mtime
+        return all(built >= source.stat().st_mtime for source in sources)
+    except OSError:
+        return False
+
+
+def _convert_unless_up_to_date(md_path):
+    """Batch step: convert md_path (a file in input/) unless its PDF is up to date.
+
+    Make-style: the PDF depends on the markdown and on this script, which holds the
+    LaTeX header and the preprocessing, so editing either rebuilds it. It must also
+    be a full render in the mode asked for now: a --fast PDF is rebuilt compressed
+    by a normal run, and a safe-mode PDF is always retried.
+    """
+    pdf_path = Path(output_folder) / f"{md_path.stem}.pdf"
+    if (_built_as(pdf_path) == _render_mode()
+            and _is_up_to_date(pdf_path, md_path, Path(__file__))):
+        print(f"Skip (up-to-date): {md_path.name}")
+        return True
+    return convert_md_to_pdf(md_path.name, None)
+
+
 def convert_md_to_pdf(md_path: str, output_path: str | None = None) -> bool:
     """Convert one markdown file to a PDF in output/.
 
@@ -660,7 +920,7 @@ def convert_md_to_pdf(md_path: str, output_path: str | None = None) -> bool:
     os.makedirs(output_folder, exist_ok=True)
     full_output_path = Path(output_folder) / pdf_name
 
-    if not which("pandoc"):
+    if not find_tool("pandoc"):
         print("Error: pandoc not found. Please install pandoc to convert Markdown to PDF.")
         return False
 
@@ -688,20 +948,54 @@ def convert_md_to_pdf(md_path: str, output_path: str | None = None) -> bool:
 
 
 def main():
+    # --fast can go anywhere among the arguments
+    if "--fast" in sys.argv:
+        sys.argv.remove("--fast")
+        os.environ["FILECONV_FAST"] = "1"
+
     if len(sys.argv) < 2:
         # No args: convert all .md files in input/
         md_files = sorted(Path(input_folder).glob("*.md")) if os.path.isdir(input_folder) else []
         if not md_files:
             print("No .md files found in input folder")
-            print("Usage: python md_pdf.py <file.md> [output.pdf]")
+            print("Usage: python md_pdf.py [--fast] <file.md> [output.pdf]")
             print("Example: python md_pdf.py notes.md")
             print("Example: python md_pdf.py notes.md my_notes.pdf")
             return
-        any_failed = False
+        # Checked once here rather than failing the same way for every file
+        if not find_tool("pandoc"):
+            print("Error: pandoc not found. Please install pandoc to convert Markdown to PDF.")
+            sys.exit(1)
+        # Files with identical content give identical PDFs, so only the first of
+        # each group is rendered and the rest get a copy of its PDF
+        groups = {}
         for md in md_files:
-            if not convert_md_to_pdf(md.name, None):
-                any_failed = True
-        if any_failed:
+            groups.setdefault(hashlib.sha256(md.read_bytes()).digest(), []).append(md)
+
+        # Each conversion is almost all time spent waiting on pandoc/xelatex, so
+        # threads are enough to run them side by side. At most one per CPU, since
+        # each xelatex run is CPU-bound.
+        workers = min(os.cpu_count() or 1, len(groups))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda group: _convert_unless_up_to_date(group[0]),
+                                        groups.values()))
+
+        ok = all(results)
+        for (first, *duplicates), converted in zip(groups.values(), results):
+            for md in duplicates:
+                if not converted:
+                    print(f"Error: not converting '{md.name}', its content is the same as "
+                          f"'{first.name}', which failed")
+                    continue
+                pdf_path = Path(output_folder) / f"{md.stem}.pdf"
+                try:
+                    copyfile(Path(output_folder) / f"{first.stem}.pdf", pdf_path)
+                    print(f"Copied '{first.stem}.pdf' to '{pdf_path}' "
+                          f"(same content as '{first.name}')")
+                except OSError as e:
+                    print(f"Error copying PDF for '{md.name}': {e}")
+                    ok = False
+        if not ok:
             sys.exit(1)
         return
 
@@ -6,6 +6,7 @@ transparency), and saves it as a single-page PDF in output/.
 
 import os
 import glob
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 
 # Get the directory where this script is located
@@ -16,6 +17,34 @@ input_folder = os.path.join(script_dir, 'input')
 output_folder = os.path.join(script_dir, 'output')
 
 
+def convert_one(png_file: str) -> tuple[str, str | None, str | None]:
+    """Convert one PNG to a single-page PDF in the output folder.
+
+    Runs on a worker thread, so it returns the outcome for the caller to report
+    rather than printing it.
+
+    Returns:
+        (input path, PDF filename or None, error message or None)
+    """
+    try:
+        # Get filename without extension
+        filename = os.path.splitext(os.path.basename(png_file))[0]
+        pdf_file = os.path.join(output_folder, f"{filename}.pdf")
+
+        # Open and convert image to PDF
+        with Image.open(png_file) as img:
+            # Convert to RGB if necessary (PNG files often have transparency/RGBA)
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+
+            # Save as PDF
+            img.save(pdf_file, "PDF", resolution=100.0)
+        return png_file, f"{filename}.pdf", None
+
+    except Exception as e:
+        return png_file, None, str(e)
+
+
 def convert_png_to_pdf() -> str:
     """Convert all PNG files in the input folder to PDF files in the output folder.
 
@@ -39,29 +68,21 @@ def convert_png_to_pdf() -> str:
 
     print(f"Found {len(png_files)} PNG files to convert")
 
+    # PNG decoding (zlib) and the PDF's JPEG compression both run with the GIL
+    # released, so files are converted on a thread per core
+    with ThreadPoolExecutor(max_workers=min(os.cpu_count() or 1, len(png_files))) as executor:
+        results = list(executor.map(convert_one, png_files))
+
     converted = []
     errors = []
 
-    for png_file in png_files:
-        try:
-            # Get filename without extension
-            filename = os.path.splitext(os.path.basename(png_file))[0]
-            pdf_file = os.path.join(output_folder, f"{filename}.pdf")
-
-            # Open and convert image to PDF
-            with Image.open(png_file) as img:
-                # Convert to RGB if necessary (PNG files often have transparency/RGBA)
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-
-                # Save as PDF
-                img.save(pdf_file, "PDF", resolution=100.0)
-                print(f"Converted: {os.path.basename(png_file)} -> {filename}.pdf")
-                converted.append(f"{filename}.pdf")
-
-        except Exception as e:
-            print(f"Error converting {png_file}: {str(e)}")
-            errors.append(f"{os.path.basename(png_file)}: {e}")
+    for png_file, pdf_name, error in results:
+        if error is None:
+            print(f"Converted: {os.path.basename(png_file)} -> {pdf_name}")
+            converted.append(pdf_name)
+        else:
+            print(f"Error converting {png_file}: {error}")
+            errors.append(f"{os.path.basename(png_file)}: {error}")
 
     if not converted:
         return f"No files converted. {len(errors)} failed: {'; '.join(errors)}"
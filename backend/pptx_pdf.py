@@ -85,14 +85,16 @@ def convert_pptx_to_pdf() -> str:
                 pptx_file
             ]
 
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            # stderr stays bytes and is only decoded if the conversion fails
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
 
             if result.returncode == 0:
                 print(f"Converted: {os.path.basename(pptx_file)} -> {filename}.pdf")
                 converted.append(f"{filename}.pdf")
             else:
-                print(f"Error converting {pptx_file}: {result.stderr}")
-                errors.append(f"{os.path.basename(pptx_file)}: {result.stderr.strip()}")
+                stderr = result.stderr.decode('utf-8', errors='replace')
+                print(f"Error converting {pptx_file}: {stderr}")
+                errors.append(f"{os.path.basename(pptx_file)}: {stderr.strip()}")
 
         except FileNotFoundError:
             errors.append("LibreOffice executable became unavailable during run")